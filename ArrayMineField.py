@@ -0,0 +1,403 @@
+import itertools
+import random
+
+import Bitboard
+from MineField import generate_mines, check_parameters, first_click_excluded, MOVE_REVEAL, MOVE_FLAG, MOVE_CHORD
+from NeighborIndex import neighbor_index, NEIGHBORS
+
+# Every square of the field is packed into a single byte of a bytearray. The lowest bits hold the boolean state of
+# the square, the upper nibble holds the number of neighboring mines (0-8). The number is counted only when it is
+# needed for the first time, COUNTED tells that it is already valid.
+MINE = 0b0001
+REVEALED = 0b0010
+FLAGGED = 0b0100
+COUNTED = 0b1000
+NUMBER_SHIFT = 4
+
+_CLEAR_NUMBER = bytes(value & (MINE | REVEALED | FLAGGED) for value in range(256))
+"""Translation table that clears COUNTED and the number of a square, keeping its state."""
+
+_layer_tables = {}
+"""Translation tables for 'ArrayMineField.layer', keyed by the mask of bits."""
+
+
+class ArrayMineField:
+    """Alternative implementation of 'MineField.MineField' that keeps the whole field in one packed bytearray
+    instead of a list of lists of 'Square' instances. The public interface is the same, so the UI can use either
+    of them. Square with column 'col' and row 'row' is stored at flat index 'col * number_of_rows + row'."""
+
+    class Square:
+        """Read-only view of one square of the field. It does not hold any state itself, it only reads the byte
+        of the square from the packed array, so creating one is cheap and they are never stored anywhere."""
+        __slots__ = ('_field', '_cells', '_index')
+
+        def __init__(self, field, index: int):
+            self._field = field
+            self._cells = field._cells
+            self._index = index
+
+        @property
+        def number(self):
+            return self._field._number(self._index)
+
+        @property
+        def is_mine(self):
+            return bool(self._cells[self._index] & MINE)
+
+        @property
+        def is_flagged(self):
+            return bool(self._cells[self._index] & FLAGGED)
+
+        @property
+        def is_revealed(self):
+            return bool(self._cells[self._index] & REVEALED)
+
+    class Column:
+        """Read-only view of one column of the field, so that 'field[col][row]' works the same way as with
+        'MineField.MineField'."""
+        __slots__ = ('_field', '_offset', '_num_of_rows')
+
+        def __init__(self, field, offset: int, number_of_rows: int):
+            self._field = field
+            self._offset = offset
+            self._num_of_rows = number_of_rows
+
+        def __len__(self):
+            return self._num_of_rows
+
+        def __getitem__(self, row: int):
+            if row < 0:
+                row += self._num_of_rows
+            if not 0 <= row < self._num_of_rows:
+                raise IndexError('row index out of range')
+            return ArrayMineField.Square(self._field, self._offset + row)
+
+    class Field:
+        """Read-only view of the whole field (indexed by column first)."""
+        __slots__ = ('_field', '_num_of_columns', '_num_of_rows')
+
+        def __init__(self, field, number_of_columns: int, number_of_rows: int):
+            self._field = field
+            self._num_of_columns = number_of_columns
+            self._num_of_rows = number_of_rows
+
+        def __len__(self):
+            return self._num_of_columns
+
+        def __getitem__(self, col: int):
+            if col < 0:
+                col += self._num_of_columns
+            if not 0 <= col < self._num_of_columns:
+                raise IndexError('column index out of range')
+            return ArrayMineField.Column(self._field, col * self._num_of_rows, self._num_of_rows)
+
+        def __iter__(self):
+            for col in range(self._num_of_columns):
+                yield self[col]
+
+    def __init__(self, number_of_columns: int, number_of_rows: int, number_of_mines: int, mines=None, seed=None,
+                 first_click=None):
+        """Same parameters as the constructor of 'MineField.MineField'."""
+        if mines is None:
+            check_parameters(number_of_columns, number_of_rows, number_of_mines, first_click)
+        self._num_of_columns = number_of_columns
+        self._num_of_rows = number_of_rows
+        self._num_of_mines = number_of_mines
+
+        self._mines = None if mines is None else [col * number_of_rows + row for col, row in mines]
+        """List of mines. Each mine is a flat index of the square (see the class docstring)."""
+
+        self._seed = seed if seed is not None else random.randrange(2 ** 32)
+        """Seed of the random generator used for generating mines."""
+
+        self._first_click = first_click
+        """Mode of the first click, see 'MineField.FIRST_CLICK_SAFE'. When it is set, mines are generated in 'reveal'."""
+
+        self._boom = False
+        """Variable telling us whether the game is lost."""
+
+        self._num_of_squares = number_of_columns * number_of_rows
+
+        self._cells = bytearray(self._num_of_squares + 1)
+        """One byte per square, see the constants at the top of the module. The last byte is a sentinel for
+        the missing neighbors of the squares at the border (see 'NeighborIndex'), it looks revealed and has no mine."""
+        self._cells[-1] = REVEALED
+
+        self._neighbor_index = None
+        """Neighbors of all the squares, it is loaded from the shared cache when it is needed for the first time."""
+
+        self.field = self.Field(self, number_of_columns, number_of_rows)
+        """Read-only view of the squares, 'field[col][row]' behaves like in 'MineField.MineField'."""
+
+        self._num_of_flags = 0
+        """Number of flagged squares, it is kept up to date by every change of a flag, so the counter of mines is
+        cheap."""
+
+        self._num_of_safe_squares_left = self._num_of_squares - number_of_mines
+        """Number of squares that are not a mine and were not revealed yet. When it drops to zero the game is won."""
+
+        if self._mines is None and first_click is None:
+            self._generate_mines()
+        if self._mines is not None:
+            self._place_mines()
+
+    def _place_mines(self):
+        """Update the field based on where the mines were generated. Numbers of the squares are not counted here,
+        but in '_number' when they are needed, so creating even the biggest field takes only a few milliseconds."""
+        self._num_of_safe_squares_left = self._num_of_squares - len(self._mines)
+        cells = self._cells
+        # Numbers read before the mines were placed (first_click mode) are counted without mines, drop them.
+        cells[:self._num_of_squares] = cells[:self._num_of_squares].translate(_CLEAR_NUMBER)
+        for mine in self._mines:
+            cells[mine] |= MINE
+
+    @property
+    def number_of_mines(self):
+        return self._num_of_mines
+
+    @property
+    def seed(self):
+        return self._seed
+
+    @property
+    def first_click(self):
+        return self._first_click
+
+    @property
+    def mines_placed(self):
+        """Mines are not placed until the first click if the field was created with 'first_click'."""
+        return self._mines is not None
+
+    @property
+    def boom(self):
+        return self._boom
+
+    @boom.setter
+    def boom(self, value: bool):
+        self._boom = value
+
+    def _generate_mines(self, excluded=()):
+        """Generates list of mines -> self._mines.
+        :param excluded: Flat indices of squares that must not contain a mine. (Default: ())"""
+        self._mines = generate_mines(self._num_of_columns, self._num_of_rows, self._num_of_mines, self._seed, excluded)
+
+    def get_dimensions(self):
+        """Function called in UI - get the proportions of the minefield."""
+        return self._num_of_columns, self._num_of_rows
+
+    def _neighbors(self, index: int):
+        """Returns flat indices of the 8 squares around the square 'index', missing neighbors at the border are
+        the sentinel index."""
+        if self._neighbor_index is None:
+            self._neighbor_index = neighbor_index(self._num_of_columns, self._num_of_rows)
+        return self._neighbor_index[index * NEIGHBORS:index * NEIGHBORS + NEIGHBORS]
+
+    def _number(self, index: int):
+        """Returns the number of mines around the square 'index'. It is counted on the first call and stored in
+        the upper nibble of the square."""
+        cells = self._cells
+        value = cells[index]
+        if not value & COUNTED:
+            number = 0
+            for neighbor in self._neighbors(index):
+                number += cells[neighbor] & MINE
+            value |= COUNTED | number << NUMBER_SHIFT
+            cells[index] = value
+        return value >> NUMBER_SHIFT
+
+    def layer(self, mask: int):
+        """Returns bytes with one byte per square (in the order of flat indices) - 1 if the square has any of the
+        bits of 'mask' (MINE, REVEALED or FLAGGED) set, 0 otherwise. The translation runs in C, so it is fast even
+        for the biggest fields."""
+        if mask not in _layer_tables:
+            _layer_tables[mask] = bytes(1 if value & mask else 0 for value in range(256))
+        return self._cells[:self._num_of_squares].translate(_layer_tables[mask])
+
+    def bitboard(self, mask: int):
+        """Returns the layer of 'mask' (see 'layer') as a bitboard - a big integer with bit i set if the square with
+        flat index i has any of the bits of 'mask' set (see 'Bitboard')."""
+        return Bitboard.from_layer(self.layer(mask))
+
+    def _set_bit(self, layer: bytes, bit: int):
+        """Sets 'bit' (e.g. REVEALED) of all the squares that are 1 in the layer (one byte per square). The layer is
+        combined with the cells as big integers, which does the work for all the squares at once."""
+        cells = self._cells
+        number_of_squares = self._num_of_squares
+        state = int.from_bytes(cells[:number_of_squares], 'little')
+        state |= int.from_bytes(layer.translate(bytes.maketrans(b'\x00\x01', bytes([0, bit]))), 'little')
+        cells[:number_of_squares] = state.to_bytes(number_of_squares, 'little')
+
+    @classmethod
+    def from_layers(cls, number_of_columns: int, number_of_rows: int, number_of_mines: int, mines: bytes,
+                    revealed: bytes, flagged: bytes, seed=None, boom=False, first_click=None, mines_placed=True):
+        """Creates a field in the given state, e.g. a saved game. Layers have one byte (0 or 1) per square,
+        the same as the ones returned by 'layer'. If 'mines_placed' is False, the mines are placed on the first
+        click according to 'first_click' and the layer of mines is ignored."""
+        mine_squares = None
+        if mines_placed:
+            mine_squares = []
+            index = mines.find(1)
+            while index != -1:
+                mine_squares.append(divmod(index, number_of_rows))
+                index = mines.find(1, index + 1)
+        field = cls(number_of_columns, number_of_rows, number_of_mines, mines=mine_squares, seed=seed,
+                    first_click=first_click)
+
+        field._set_bit(revealed, REVEALED)
+        field._set_bit(flagged, FLAGGED)
+        field._num_of_flags = flagged.count(1)
+        field._num_of_safe_squares_left -= Bitboard.popcount(field.bitboard(REVEALED) & ~field.bitboard(MINE))
+        field.boom = boom
+        return field
+
+    def toggle_flag(self, col: int, row: int):
+        """This function makes a square flagged if it is not, and unflagged if it is flagged."""
+        index = col * self._num_of_rows + row
+        self._cells[index] ^= FLAGGED
+        self._num_of_flags += 1 if self._cells[index] & FLAGGED else -1
+
+    @property
+    def mines_left(self):
+        """Number of mines minus the number of flags - the counter shown to the player. It can be negative if there
+        are more flags than mines."""
+        return self._num_of_mines - self._num_of_flags
+
+    def statistics(self):
+        """Returns a dictionary with the numbers of squares - 'mines', 'revealed', 'hidden', 'flagged',
+        'flagged_correctly' (flags on mines), 'flagged_wrongly' and 'mines_left' (see 'mines_left'). They are counted
+        as popcounts of bitboards, so even the biggest field takes only a few milliseconds."""
+        mines, revealed, flagged = self.bitboard(MINE), self.bitboard(REVEALED), self.bitboard(FLAGGED)
+        return {
+            'mines': Bitboard.popcount(mines),
+            'revealed': Bitboard.popcount(revealed),
+            'hidden': self._num_of_squares - Bitboard.popcount(revealed),
+            'flagged': Bitboard.popcount(flagged),
+            'flagged_correctly': Bitboard.popcount(flagged & mines),
+            'flagged_wrongly': Bitboard.popcount(flagged & ~mines),
+            'mines_left': self._num_of_mines - Bitboard.popcount(flagged),
+        }
+
+    def check_win(self):
+        """Returns whether the game should end because the player revealed all squares that are not a mine, or not."""
+        if self._num_of_safe_squares_left == 0:
+            self.reveal_all()
+            return True
+
+        return False
+
+    def reveal_all(self, only_mines=False):
+        """Reveals every square, unless the parameter 'only_mines' is specified as 'True'. Then reveals only mines.
+        :param only_mines: In case of losing, there is no need to reveal squares that do not contain mine.
+        (Default: False)
+        :return: Set of squares (tuples of column and row) that were not revealed before the call."""
+        return self._to_squares(self._reveal_all(only_mines))
+
+    def _reveal_all(self, only_mines=False):
+        """Same as 'reveal_all', but returns a list of flat indices. The squares to reveal are one bitboard, which is
+        set in all the cells at once, so no square is visited in Python except the returned ones."""
+        hidden = ~self.bitboard(REVEALED) & (self.bitboard(MINE) if only_mines else Bitboard.full(self._num_of_squares))
+        if not hidden:
+            return []
+        layer = Bitboard.to_layer(hidden, self._num_of_squares)
+        self._set_bit(layer, REVEALED)
+        return list(itertools.compress(range(self._num_of_squares), layer))
+
+    def reveal(self, col: int, row: int):
+        """This function represents a click on the square - reveals the square. If the square contains a mine,
+        the game is lost. If no neighbor is a mine, all the neighbors are revealed too. The flood is done with an
+        explicit stack instead of recursion, so big empty areas can not hit the recursion limit.
+        :return: Set of squares (tuples of column and row) that were revealed by this click."""
+        revealed = []
+        self._reveal(col * self._num_of_rows + row, revealed)
+        return self._to_squares(revealed)
+
+    def _reveal(self, index: int, revealed: list):
+        """Reveals the square with flat index 'index' like 'reveal' and appends flat indices of the revealed squares
+        to the list 'revealed'."""
+        if self._mines is None:
+            # First click - generate mines so that the square is safe.
+            col, row = divmod(index, self._num_of_rows)
+            self._generate_mines(first_click_excluded(self._num_of_columns, self._num_of_rows, self._num_of_mines,
+                                                      col, row, self._first_click))
+            self._place_mines()
+
+        cells = self._cells
+        if cells[index] & REVEALED:
+            return
+
+        if cells[index] & MINE:
+            self.boom = True  # Game over
+            revealed.extend(self._reveal_all(only_mines=True))
+            return
+
+        stack = [index]
+        start = len(revealed)
+        revealed.append(index)
+        cells[index] |= REVEALED
+        while stack:
+            index = stack.pop()
+
+            # If number is zero, reveal neighbors as well. The sentinel looks revealed, so it is skipped.
+            if self._number(index) == 0:
+                for neighbor in self._neighbors(index):
+                    if not cells[neighbor] & REVEALED:
+                        cells[neighbor] |= REVEALED
+                        stack.append(neighbor)
+                        revealed.append(neighbor)
+        self._num_of_safe_squares_left -= len(revealed) - start
+
+    def _chord(self, index: int, revealed: list):
+        """Reveals all hidden neighbors without a flag of a revealed number, if the number of flags around it is
+        equal to the number. Flat indices of revealed squares are appended to the list 'revealed'."""
+        cells = self._cells
+        if cells[index] & (REVEALED | MINE) != REVEALED:
+            return
+        neighbors = self._neighbors(index)
+        if sum(1 for neighbor in neighbors if cells[neighbor] & FLAGGED) != self._number(index):
+            return
+        for neighbor in neighbors:
+            if not cells[neighbor] & (REVEALED | FLAGGED):
+                self._reveal(neighbor, revealed)
+                if self._boom:
+                    return
+
+    def apply_moves(self, moves):
+        """Applies moves in one pass, see 'MineField.MineField.apply_moves'. Changed squares are collected as flat
+        indices and converted to tuples only once at the end.
+        :param moves: Iterable of tuples (kind, col, row), kind is MOVE_REVEAL, MOVE_FLAG or MOVE_CHORD.
+        :return: Set of squares (tuples of column and row) that changed."""
+        cells = self._cells
+        rows = self._num_of_rows
+        changed = []
+        for kind, col, row in moves:
+            if self._boom or self._num_of_safe_squares_left == 0:
+                break
+            index = col * rows + row
+            if kind == MOVE_REVEAL:
+                if not cells[index] & FLAGGED:
+                    self._reveal(index, changed)
+            elif kind == MOVE_FLAG:
+                if not cells[index] & REVEALED:
+                    self.toggle_flag(col, row)
+                    changed.append(index)
+            elif kind == MOVE_CHORD:
+                self._chord(index, changed)
+            else:
+                raise ValueError(f"Unknown move: {kind}")
+
+        if not self._boom and self._num_of_safe_squares_left == 0:
+            changed.extend(self._reveal_all())
+        return self._to_squares(changed)
+
+    def reveal_many(self, squares):
+        """Reveals all the squares (tuples of column and row), see 'apply_moves'."""
+        return self.apply_moves((MOVE_REVEAL, col, row) for col, row in squares)
+
+    def chord(self, col: int, row: int):
+        """Reveals all hidden neighbors of a revealed number with enough flags around it, see 'apply_moves'."""
+        return self.apply_moves([(MOVE_CHORD, col, row)])
+
+    def _to_squares(self, indices):
+        """Converts flat indices to a set of tuples of column and row."""
+        rows = self._num_of_rows
+        return {divmod(index, rows) for index in indices}
@@ -0,0 +1,35 @@
+"""Bitboards - layers of a field (mines, revealed squares, flags) as Python big integers, bit i is the square with
+flat index i (col * rows + row). Operations on whole layers are then single operations on integers that run in C:
+a union is '|', a mask comparison is '==' and counting the squares is a popcount ('int.bit_count').
+
+Layers with one byte (0 or 1) per square, such as 'ArrayMineField.layer', are converted through a string of binary
+digits, which CPython parses and formats in linear time for base 2.
+"""
+
+_TO_ASCII = bytes.maketrans(b'\x00\x01', b'01')
+
+
+def full(number_of_squares: int):
+    """Returns the bitboard with all the squares set."""
+    return (1 << number_of_squares) - 1
+
+
+def from_layer(layer: bytes):
+    """Returns the bitboard of a layer with one byte (0 or 1) per square."""
+    if not layer:
+        return 0
+    return int(layer.translate(_TO_ASCII)[::-1], 2)
+
+
+def to_layer(bitboard: int, number_of_squares: int, value=1):
+    """Inverse of 'from_layer' - returns bytes with one byte per square, 'value' for the squares that are set in
+    the bitboard and 0 for the others. Bits above 'number_of_squares' are ignored."""
+    if not number_of_squares:
+        return b''
+    digits = format(bitboard & full(number_of_squares), f'0{number_of_squares}b')[::-1].encode()
+    return digits.translate(bytes.maketrans(b'01', bytes([0, value])))
+
+
+def popcount(bitboard: int):
+    """Returns the number of squares that are set in the bitboard."""
+    return bitboard.bit_count()
@@ -1,5 +1,75 @@
+import collections
 import random
 
+FIRST_CLICK_SAFE = 'safe'
+"""The first revealed square is never a mine."""
+
+FIRST_CLICK_ZERO = 'zero'
+"""The first revealed square and all its neighbors are never a mine, so the first click always opens an empty area."""
+
+MOVE_REVEAL = 'reveal'
+MOVE_FLAG = 'flag'
+MOVE_CHORD = 'chord'
+"""Kinds of moves of 'MineField.apply_moves'. Chord reveals all hidden neighbors of a revealed number that has
+the same number of flags around it."""
+
+
+def generate_mines(number_of_columns: int, number_of_rows: int, number_of_mines: int, seed=None, excluded=()):
+    """Returns a list of 'number_of_mines' different flat indices (col * number_of_rows + row) of squares that
+    contain a mine. Squares are sampled without replacement, so it takes O(number_of_mines) time no matter how dense
+    the field is, and the same seed always gives the same mines.
+
+    :param seed: Seed of the random generator. (Default: None - random mines every time)
+    :param excluded: Flat indices of squares that must not contain a mine, e.g. the first click. (Default: ())
+    :return: List of flat indices of mines."""
+    number_of_squares = number_of_columns * number_of_rows
+    excluded = sorted(set(excluded))
+    if not 0 <= number_of_mines <= number_of_squares - len(excluded):
+        raise ValueError(f"Cannot place {number_of_mines} mines on a field of {number_of_squares} squares "
+                         f"with {len(excluded)} squares excluded.")
+
+    mines = random.Random(seed).sample(range(number_of_squares - len(excluded)), number_of_mines)
+    if not excluded:
+        return mines
+
+    # Every excluded square lower or equal to the sampled index shifts the index by one, so that the sampled
+    # indices are spread only over the squares that are not excluded.
+    shifted_mines = []
+    for mine in mines:
+        for square in excluded:
+            if square > mine:
+                break
+            mine += 1
+        shifted_mines.append(mine)
+    return shifted_mines
+
+
+def check_parameters(number_of_columns: int, number_of_rows: int, number_of_mines: int, first_click=None):
+    """Raises ValueError if a field with these parameters can not be played, so that it fails when it is created and
+    not at the first click, when the mines of a field with 'first_click' are generated."""
+    if first_click not in (None, FIRST_CLICK_SAFE, FIRST_CLICK_ZERO):
+        raise ValueError(f"Unknown first click mode: {first_click}")
+    number_of_squares = number_of_columns * number_of_rows
+    safe_squares = 1 if first_click is not None else 0
+    if not 0 <= number_of_mines <= number_of_squares - safe_squares:
+        raise ValueError(f"Cannot place {number_of_mines} mines on a field of {number_of_squares} squares"
+                         + (" with a safe first click." if safe_squares else "."))
+
+
+def first_click_excluded(number_of_columns: int, number_of_rows: int, number_of_mines: int, col: int, row: int,
+                         first_click: str):
+    """Returns flat indices of squares that must not contain a mine when the first click is on square (col, row).
+    If there is not enough space for the mines around an empty area, only the clicked square is kept safe."""
+    if first_click == FIRST_CLICK_ZERO:
+        excluded = [c * number_of_rows + r
+                    for c in range(max(col - 1, 0), min(col + 1, number_of_columns - 1) + 1)
+                    for r in range(max(row - 1, 0), min(row + 1, number_of_rows - 1) + 1)]
+        if number_of_mines <= number_of_columns * number_of_rows - len(excluded):
+            return excluded
+    elif first_click != FIRST_CLICK_SAFE:
+        raise ValueError(f"Unknown first click mode: {first_click}")
+    return [col * number_of_rows + row]
+
 
 class MineField:
     class Square:
@@ -59,10 +129,20 @@ class MineField:
         def is_revealed(self, value: bool):
             self._is_revealed = value
 
-    def __init__(self, number_of_columns: int, number_of_rows: int, number_of_mines: int, mines=None):
+    def __init__(self, number_of_columns: int, number_of_rows: int, number_of_mines: int, mines=None, seed=None,
+                 first_click=None):
         """A constructor for a class that carries all the information about the current field of mines.
         If a player decides to change the size of the board, it might be the best to delete current instance
-        and initialize a new one by calling the constructor. """
+        and initialize a new one by calling the constructor.
+
+        :param mines: List of mines (lists of column and row). If not given, mines are generated randomly.
+        :param seed: Seed used for generating mines, so that the same field can be created again. (Default: None -
+        a random seed is chosen and can be read from the property 'seed')
+        :param first_click: None, FIRST_CLICK_SAFE or FIRST_CLICK_ZERO. If given, mines are generated only when
+        the first square is revealed, so that the first click is never a mine (or always opens an empty area)."""
+
+        if mines is None:
+            check_parameters(number_of_columns, number_of_rows, number_of_mines, first_click)
 
         self._num_of_columns = number_of_columns
         """Number of columns of the field of mines. """
@@ -75,12 +155,22 @@ class MineField:
         self._mines = mines
         """List of mines. Each mine is a list of two integers - columns and row of the mine"""
 
+        self._seed = seed if seed is not None else random.randrange(2 ** 32)
+        """Seed of the random generator used for generating mines."""
+
+        self._first_click = first_click
+        """Mode of the first click, see the module constants. When it is set, mines are generated in 'reveal'."""
+
         self._boom = False
         """Variable telling us whether the game is lost."""
 
-        self._list_of_safe_squares = []
-        """This list will contain all the squares that do not contain a mine. If square is revealed, it is also deleted
-        from this list and when the list is empty the game is won."""
+        self._safe_squares = set()
+        """This set will contain all the squares (tuples of column and row) that do not contain a mine. If square is
+        revealed, it is also removed from this set and when the set is empty the game is won. Set is used instead of
+        a list so that removing a square does not need to search for it."""
+
+        self._num_of_flags = 0
+        """Number of flagged squares, it is kept up to date by 'toggle_flag', so the counter of mines is cheap."""
 
         # Initialize field of mines based on number of columns and rows that are parameters of the constructor.
         self.field = []
@@ -90,23 +180,61 @@ class MineField:
             new_col = []
             for row in range(number_of_rows):
                 new_col.append(self.Square(col=col, row=row))
-                self._list_of_safe_squares.append([col, row])
+                self._safe_squares.add((col, row))
             self.field.append(new_col)
 
-        self._generate_mines() # Generate mines, which saves a list of mine coordinates into a list 'self._mines'.
-
-        # Update the field based on where the mines were generated.
+        if self._mines is None and first_click is None:
+            self._generate_mines() # Generate mines, which saves a list of mine coordinates into a list 'self._mines'.
+        if self._mines is not None:
+            self._place_mines()
+
+    @classmethod
+    def from_layers(cls, number_of_columns: int, number_of_rows: int, number_of_mines: int, mines: bytes,
+                    revealed: bytes, flagged: bytes, seed=None, boom=False, first_click=None, mines_placed=True):
+        """Creates a field in the given state, e.g. a saved game, see 'ArrayMineField.ArrayMineField.from_layers'.
+        Layers have one byte (0 or 1) per square in the order of flat indices (col * number_of_rows + row)."""
+        mine_squares = None
+        if mines_placed:
+            mine_squares = [list(divmod(index, number_of_rows)) for index, is_mine in enumerate(mines) if is_mine]
+        field = cls(number_of_columns, number_of_rows, number_of_mines, mines=mine_squares, seed=seed,
+                    first_click=first_click)
+
+        for index, (is_revealed, is_flagged) in enumerate(zip(revealed, flagged)):
+            col, row = divmod(index, number_of_rows)
+            if is_revealed:
+                field.field[col][row].is_revealed = True
+                field._safe_squares.discard((col, row))
+            if is_flagged:
+                field.toggle_flag(col, row)
+        field.boom = boom
+        return field
+
+    def _place_mines(self):
+        """Update the field based on where the mines were generated."""
         for mine in self._mines:
             col = mine[0]
             row = mine[1]
             self.field[col][row].is_mine = True
-            self._list_of_safe_squares.pop(self._list_of_safe_squares.index([col, row]))
+            self._safe_squares.discard((col, row))
             self._increment_neighbors(col, row)
 
     @property
     def number_of_mines(self):
         return self._num_of_mines
 
+    @property
+    def seed(self):
+        return self._seed
+
+    @property
+    def first_click(self):
+        return self._first_click
+
+    @property
+    def mines_placed(self):
+        """Mines are not placed until the first click if the field was created with 'first_click'."""
+        return self._mines is not None
+
     @property
     def boom(self):
         return self._boom
@@ -115,14 +243,11 @@ class MineField:
     def boom(self, value: bool):
         self._boom = value
 
-    def _generate_mines(self):
-        """Generates list of mines -> self._mines."""
-        self._mines = []
-        while len(self._mines) < self._num_of_mines:
-            x = random.randint(0, self._num_of_columns-1)
-            y = random.randint(0, self._num_of_rows-1)
-            if [x, y] not in self._mines:  # We do not want duplicate mines.
-                self._mines.append([x, y])
+    def _generate_mines(self, excluded=()):
+        """Generates list of mines -> self._mines.
+        :param excluded: Flat indices of squares that must not contain a mine. (Default: ())"""
+        mines = generate_mines(self._num_of_columns, self._num_of_rows, self._num_of_mines, self._seed, excluded)
+        self._mines = [list(divmod(mine, self._num_of_rows)) for mine in mines]
 
     def get_dimensions(self):
         """Function called in UI - get the proportions of the minefield."""
@@ -145,12 +270,20 @@ class MineField:
         """This function makes a square flagged if it is not, and unflagged if it is flagged."""
         if self.field[col][row].is_flagged:
             self.field[col][row].is_flagged = False
+            self._num_of_flags -= 1
             return
         self.field[col][row].is_flagged = True
+        self._num_of_flags += 1
+
+    @property
+    def mines_left(self):
+        """Number of mines minus the number of flags - the counter shown to the player. It can be negative if there
+        are more flags than mines."""
+        return self._num_of_mines - self._num_of_flags
 
     def check_win(self):
         """Returns whether the game should end because the player revealed all squares that are not a mine, or not."""
-        if len(self._list_of_safe_squares) == 0:
+        if not self._safe_squares:
             self.reveal_all()
             return True
 
@@ -159,32 +292,114 @@ class MineField:
     def reveal_all(self, only_mines=False):
         """Reveals every square, unless the parameter 'only_mines' is specified as 'True'. Then reveals only mines.
         :param only_mines: In case of losing, there is no need to reveal squares that do not contain mine.
-        (Default: False)"""
-        for mine in self._mines:
-            self.field[mine[0]][mine[1]].is_revealed = True
-        if only_mines: return
-
-        for square in self._list_of_safe_squares:
-            self.field[square[0]][square[1]].is_revealed = True
+        (Default: False)
+        :return: Set of squares (tuples of column and row) that were not revealed before the call."""
+        revealed = set()
+        for col, row in self._mines or ():  # No mines before the first click of a field with 'first_click'.
+            if not self.field[col][row].is_revealed:
+                self.field[col][row].is_revealed = True
+                revealed.add((col, row))
+        if only_mines: return revealed
+
+        for col, row in self._safe_squares:
+            self.field[col][row].is_revealed = True
+        revealed.update(self._safe_squares)
+        return revealed
 
     def reveal(self, col: int, row: int):
         """This function represents a click on the square - reveals the square. If the square contains a mine,
-        it is triggered by calling 'boom()'. If no neighbor is a mine (_num_of_mines == 0), the function calls itself
-        with parameters of all the neighbors."""
+        the game is lost. If no neighbor is a mine (number == 0), all the neighbors are revealed as well. The empty
+        area is opened breadth-first with a queue instead of recursion, so it can not hit the recursion limit.
+        :return: Set of squares (tuples of column and row) that were revealed by this click."""
+        revealed = set()
+        self._reveal(col, row, revealed)
+        return revealed
+
+    def _reveal(self, col: int, row: int, revealed: set):
+        """Reveals the square like 'reveal' and adds the revealed squares to the set 'revealed'."""
+        if self._mines is None:
+            # First click - generate mines so that the square is safe.
+            self._generate_mines(first_click_excluded(self._num_of_columns, self._num_of_rows, self._num_of_mines,
+                                                      col, row, self._first_click))
+            self._place_mines()
+
         if self.field[col][row].is_revealed:
             return
 
         if self.field[col][row].is_mine:
             self.boom = True  # Game over
-            self.reveal_all(only_mines=True)
+            revealed |= self.reveal_all(only_mines=True)
             return
 
-        # Remove a revealed square from list of unrevealed squares that are not a mine.
-        self._list_of_safe_squares.pop(self._list_of_safe_squares.index([col, row]))
+        revealed.add((col, row))
         self.field[col][row].is_revealed = True
-
-        # If number is zero, reveal neighbors in recursive manner.
-        if self.field[col][row].number == 0:
-            for c in range(max(col - 1, 0), min(col + 1, self._num_of_columns - 1) + 1):
-                for r in range(max(row - 1, 0), min(row + 1, self._num_of_rows - 1) + 1):
-                    self.reveal(c, r)
+        queue = collections.deque([(col, row)])
+        while queue:
+            col, row = queue.popleft()
+            # Remove a revealed square from the set of unrevealed squares that are not a mine.
+            self._safe_squares.discard((col, row))
+
+            # If number is zero, reveal neighbors as well.
+            if self.field[col][row].number == 0:
+                for c, r in self._neighbors(col, row):
+                    square = self.field[c][r]
+                    if not square.is_revealed:
+                        square.is_revealed = True
+                        revealed.add((c, r))
+                        queue.append((c, r))
+
+    def _neighbors(self, col: int, row: int):
+        """Returns columns and rows of the squares around the square (col, row)."""
+        return [(c, r)
+                for c in range(max(col - 1, 0), min(col + 1, self._num_of_columns - 1) + 1)
+                for r in range(max(row - 1, 0), min(row + 1, self._num_of_rows - 1) + 1)
+                if c != col or r != row]
+
+    def _chord(self, col: int, row: int, revealed: set):
+        """Reveals all hidden neighbors without a flag of a revealed number, if the number of flags around it is
+        equal to the number. Revealed squares are added to the set 'revealed'."""
+        square = self.field[col][row]
+        if not square.is_revealed or square.is_mine:
+            return
+        neighbors = self._neighbors(col, row)
+        if sum(self.field[c][r].is_flagged for c, r in neighbors) != square.number:
+            return
+        for c, r in neighbors:
+            if not self.field[c][r].is_revealed and not self.field[c][r].is_flagged:
+                self._reveal(c, r, revealed)
+                if self._boom:
+                    return
+
+    def apply_moves(self, moves):
+        """Applies moves in one pass, e.g. a batch of moves of a bot or a replay. Moves after the end of the game
+        are ignored, so are reveals of flagged squares and flags of revealed squares.
+        :param moves: Iterable of tuples (kind, col, row), kind is MOVE_REVEAL, MOVE_FLAG or MOVE_CHORD.
+        :return: Set of squares (tuples of column and row) that changed. If the moves won the game, it includes
+        the squares revealed by winning."""
+        changed = set()
+        for kind, col, row in moves:
+            if self._boom or not self._safe_squares:
+                break
+            if kind == MOVE_REVEAL:
+                if not self.field[col][row].is_flagged:
+                    self._reveal(col, row, changed)
+            elif kind == MOVE_FLAG:
+                if not self.field[col][row].is_revealed:
+                    self.toggle_flag(col, row)
+                    changed.add((col, row))
+            elif kind == MOVE_CHORD:
+                self._chord(col, row, changed)
+            else:
+                raise ValueError(f"Unknown move: {kind}")
+
+        if not self._boom and not self._safe_squares:
+            changed |= self.reveal_all()
+        return changed
+
+    def reveal_many(self, squares):
+        """Reveals all the squares (tuples of column and row), see 'apply_moves'."""
+        return self.apply_moves((MOVE_REVEAL, col, row) for col, row in squares)
+
+    def chord(self, col: int, row: int):
+        """Reveals all hidden neighbors of a revealed number with enough flags around it, see 'apply_moves'."""
+        return self.apply_moves([(MOVE_CHORD, col, row)])
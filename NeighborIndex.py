@@ -0,0 +1,44 @@
+import array
+import functools
+
+NEIGHBORS = 8
+"""Number of slots per square in the index. Squares at the border have less neighbors, the missing ones point to
+the sentinel index (number of squares), so the index can be read with a fixed stride."""
+
+_DIRECTIONS = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+
+
+@functools.lru_cache(maxsize=4)
+def neighbor_index(number_of_columns: int, number_of_rows: int):
+    """Returns a flat array of neighbors of every square of a field with the given shape. Neighbors of the square
+    with flat index i (col * number_of_rows + row) are 'index[8 * i:8 * i + 8]', missing neighbors of the squares
+    at the border are equal to the number of squares (a sentinel, so the array of squares should have one extra item
+    at the end).
+
+    The index depends only on the shape of the field, so it is shared by all the fields of the same shape and the
+    last few shapes are kept in the cache. It is built with slicing of arrays, without a Python loop per square."""
+    number_of_squares = number_of_columns * number_of_rows
+    sentinel = number_of_squares
+    padding = number_of_rows + 1
+
+    # Flat indices shifted by 'offset' are a slice of this array.
+    indices = array.array('i', range(-padding, number_of_squares + padding))
+
+    index = array.array('i', [sentinel]) * (NEIGHBORS * number_of_squares)
+    for slot, (col_shift, row_shift) in enumerate(_DIRECTIONS):
+        offset = col_shift * number_of_rows + row_shift
+        neighbors = indices[padding + offset:padding + offset + number_of_squares]
+
+        # Neighbors outside of the field are replaced by the sentinel.
+        if col_shift == -1:
+            neighbors[:number_of_rows] = array.array('i', [sentinel]) * min(number_of_rows, number_of_squares)
+        elif col_shift == 1:
+            neighbors[number_of_squares - number_of_rows:] = \
+                array.array('i', [sentinel]) * min(number_of_rows, number_of_squares)
+        if row_shift == -1:
+            neighbors[::number_of_rows] = array.array('i', [sentinel]) * number_of_columns
+        elif row_shift == 1:
+            neighbors[number_of_rows - 1::number_of_rows] = array.array('i', [sentinel]) * number_of_columns
+
+        index[slot::NEIGHBORS] = neighbors
+    return index
@@ -0,0 +1,272 @@
+"""Generation of boards that can be solved without guessing.
+
+A candidate board is given by its seed - the mines are generated with FIRST_CLICK_ZERO around the start square (see
+'start_square'), so the first click always opens an area. The candidate is accepted if 'Solver.Solver' can clear
+the whole board from there, revealing only squares that are certainly safe. Most candidates are rejected, so they are
+searched in a pool of processes, and ready boards are kept on disk in a 'BoardPool', so that a new game can start
+instantly. Boards are served with the start square already revealed.
+
+Fill the pool in advance from the command line with:
+    python NoGuess.py --columns 30 --rows 16 --mines 99 --count 20
+"""
+import argparse
+import concurrent.futures
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+import ArrayMineField
+import MineField
+import Recording
+import Serialization
+import Solver
+
+POOL_DIR = os.environ.get('MINES_POOL_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'mines', 'no-guess'))
+"""Default directory of the pool of ready boards, it can be changed by the environment variable MINES_POOL_DIR."""
+
+BATCH = 8
+"""Number of candidates checked by a worker in one task."""
+
+MAX_CANDIDATES = 20000
+"""Number of candidates after which the search gives up (e.g. the density of mines is too high)."""
+
+_stop = None
+"""Event of the worker processes telling them that a board was already found."""
+
+
+def start_square(number_of_columns: int, number_of_rows: int):
+    """Returns column and row of the square that is revealed first - the center of the board."""
+    return number_of_columns // 2, number_of_rows // 2
+
+
+def candidate(number_of_columns: int, number_of_rows: int, number_of_mines: int, seed: int):
+    """Returns the candidate board with the given seed, with the start square revealed."""
+    field = ArrayMineField.ArrayMineField(number_of_columns, number_of_rows, number_of_mines, seed=seed,
+                                          first_click=MineField.FIRST_CLICK_ZERO)
+    field.reveal(*start_square(number_of_columns, number_of_rows))
+    return field
+
+
+def is_no_guess(number_of_columns: int, number_of_rows: int, number_of_mines: int, seed: int):
+    """Returns whether the candidate board with the given seed can be cleared without guessing."""
+    field = candidate(number_of_columns, number_of_rows, number_of_mines, seed)
+    solver = Solver.Solver(field)
+    while not field.boom and not field.check_win():
+        safe, _ = solver.solve()
+        if not safe:
+            # The number of mines left can decide squares the local rules can not, e.g. at the end of the game.
+            square, probability = solver.hint()
+            if square is None or probability != 0:
+                return False
+            safe = {square}
+        solver.update(field.reveal_many(safe))
+    return not field.boom
+
+
+def _init_worker(stop):
+    global _stop
+    _stop = stop
+
+
+def _search(arguments):
+    """Checks candidates with seeds from 'first_seed' to 'last_seed' (excluded) in a worker process until one of them
+    is accepted or another worker finds one. Returns the accepted seed or None."""
+    number_of_columns, number_of_rows, number_of_mines, first_seed, last_seed = arguments
+    for seed in range(first_seed, last_seed):
+        if _stop is not None and _stop.is_set():
+            return None
+        if is_no_guess(number_of_columns, number_of_rows, number_of_mines, seed):
+            if _stop is not None:
+                _stop.set()
+            return seed
+    return None
+
+
+class Searcher:
+    """Pool of worker processes searching candidates, it can be reused for several boards. The processes are
+    spawned (not forked), so a search can be started from any thread, e.g. by the generator of the UI."""
+
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count() or 1
+        context = multiprocessing.get_context('spawn')
+        self._stop = context.Event()
+        self._searches = 0
+        """Number of searches started so far."""
+        self._cancelled = 0
+        """Searches with a lower or equal number were cancelled (see 'cancel')."""
+        self._executor = concurrent.futures.ProcessPoolExecutor(max_workers=self.workers, mp_context=context,
+                                                                initializer=_init_worker, initargs=(self._stop,))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def cancel(self):
+        """Cancels the running search, if there is one - it raises 'concurrent.futures.CancelledError' after the
+        workers finish their current candidates. Searches started later are not affected."""
+        self._cancelled = self._searches
+        self._stop.set()
+
+    def close(self):
+        self.cancel()
+        self._executor.shutdown(cancel_futures=True)
+
+    def find_seed(self, number_of_columns: int, number_of_rows: int, number_of_mines: int, seed=None):
+        """Returns the seed of the first candidate that can be solved without guessing. When it is found, the tasks
+        that did not start yet are cancelled and the running ones stop after their current candidate.
+        :param seed: First seed of the candidates. (Default: None - random)
+        :raises ValueError: If no board is found among MAX_CANDIDATES candidates.
+        :raises concurrent.futures.CancelledError: If the search is cancelled by 'cancel' from another thread."""
+        if number_of_mines > number_of_columns * number_of_rows - 1:
+            raise ValueError(f"Cannot place {number_of_mines} mines on a field of "
+                             f"{number_of_columns * number_of_rows} squares with a safe start.")
+        first_seed = seed if seed is not None else random.randrange(2 ** 32)
+        self._searches += 1
+        search = self._searches
+        self._stop.clear()
+        pending = set()
+        next_seed = first_seed
+        found = None
+        while found is None and self._cancelled < search:
+            # Keep two tasks per worker in the queue, so that no worker waits for work.
+            while len(pending) < 2 * self.workers and next_seed < first_seed + MAX_CANDIDATES:
+                pending.add(self._executor.submit(_search, (number_of_columns, number_of_rows, number_of_mines,
+                                                            next_seed, next_seed + BATCH)))
+                next_seed += BATCH
+            if not pending:
+                break
+            done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            found = min((future.result() for future in done if future.result() is not None), default=None)
+
+        self._stop.set()
+        for future in pending:
+            future.cancel()
+        # The running tasks end after their current candidate, then the workers are free for another search.
+        concurrent.futures.wait(pending)
+        if found is None and self._cancelled >= search:
+            raise concurrent.futures.CancelledError()
+        if found is None:
+            raise ValueError(f"No board of {number_of_columns}x{number_of_rows} with {number_of_mines} mines that can "
+                             f"be solved without guessing was found among {MAX_CANDIDATES} candidates.")
+        return found
+
+    def generate(self, number_of_columns: int, number_of_rows: int, number_of_mines: int, seed=None):
+        """Returns a new board that can be solved without guessing, with the start square revealed."""
+        return candidate(number_of_columns, number_of_rows, number_of_mines,
+                         self.find_seed(number_of_columns, number_of_rows, number_of_mines, seed))
+
+
+def generate(number_of_columns: int, number_of_rows: int, number_of_mines: int, seed=None, workers=None):
+    """Returns a new board that can be solved without guessing, with the start square revealed. The candidates are
+    searched in a pool of 'workers' processes (default: number of processors)."""
+    with Searcher(workers) as searcher:
+        return searcher.generate(number_of_columns, number_of_rows, number_of_mines, seed)
+
+
+def recording(field):
+    """Returns the recording of a board served by this module (with the start square revealed), so that the game
+    can be recorded and replayed like any other - the board is created again from its seed and the first click."""
+    number_of_columns, number_of_rows = field.get_dimensions()
+    return Recording.Recording(number_of_columns, number_of_rows, field.number_of_mines, field.seed,
+                               MineField.FIRST_CLICK_ZERO,
+                               [(MineField.MOVE_REVEAL, *start_square(number_of_columns, number_of_rows))])
+
+
+class BoardPool:
+    """Ready boards on disk, one directory per setting (columns, rows and mines), one saved game
+    (see 'Serialization') per board. Boards are written under a temporary name and renamed when complete, and
+    they are claimed by renaming, so several processes can share the pool."""
+
+    def __init__(self, directory=POOL_DIR):
+        self.directory = directory
+
+    def _setting_dir(self, number_of_columns, number_of_rows, number_of_mines):
+        return os.path.join(self.directory, f'{number_of_columns}x{number_of_rows}x{number_of_mines}')
+
+    def _paths(self, number_of_columns, number_of_rows, number_of_mines):
+        directory = self._setting_dir(number_of_columns, number_of_rows, number_of_mines)
+        try:
+            names = sorted(os.listdir(directory))
+        except FileNotFoundError:
+            return []
+        return [os.path.join(directory, name) for name in names if name.endswith(Serialization.FILE_EXTENSION)]
+
+    def count(self, number_of_columns: int, number_of_rows: int, number_of_mines: int):
+        return len(self._paths(number_of_columns, number_of_rows, number_of_mines))
+
+    def add(self, field):
+        number_of_columns, number_of_rows = field.get_dimensions()
+        directory = self._setting_dir(number_of_columns, number_of_rows, field.number_of_mines)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f'{field.seed}{Serialization.FILE_EXTENSION}')
+        Serialization.save(field, path + '.tmp')
+        os.replace(path + '.tmp', path)
+
+    def take(self, number_of_columns: int, number_of_rows: int, number_of_mines: int):
+        """Removes a board from the pool and returns it, or returns None if the pool of the setting is empty."""
+        for path in self._paths(number_of_columns, number_of_rows, number_of_mines):
+            claimed = f'{path}.{os.getpid()}'
+            try:
+                os.rename(path, claimed)
+            except OSError:
+                continue  # Taken by another process.
+            try:
+                return Serialization.load(claimed)
+            except (ValueError, OSError):
+                continue  # Damaged file, it is dropped.
+            finally:
+                os.remove(claimed)
+        return None
+
+    def fill(self, number_of_columns: int, number_of_rows: int, number_of_mines: int, count: int, workers=None,
+             searcher=None):
+        """Generates boards until the pool of the setting has at least 'count' of them.
+        :param searcher: 'Searcher' to use, e.g. one kept by the UI. (Default: None - a new one with 'workers'
+        processes)"""
+        if searcher is None:
+            with Searcher(workers) as searcher:
+                self.fill(number_of_columns, number_of_rows, number_of_mines, count, searcher=searcher)
+            return
+        while self.count(number_of_columns, number_of_rows, number_of_mines) < count:
+            self.add(searcher.generate(number_of_columns, number_of_rows, number_of_mines))
+
+
+def board(number_of_columns: int, number_of_rows: int, number_of_mines: int, pool=None, searcher=None):
+    """Returns a board that can be solved without guessing - from the pool if there is one, otherwise a newly
+    generated one (by 'searcher' if it is given)."""
+    pool = pool if pool is not None else BoardPool()
+    field = pool.take(number_of_columns, number_of_rows, number_of_mines)
+    if field is None:
+        if searcher is None:
+            return generate(number_of_columns, number_of_rows, number_of_mines)
+        field = searcher.generate(number_of_columns, number_of_rows, number_of_mines)
+    return field
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Fills the pool of boards that can be solved without guessing.')
+    parser.add_argument('--columns', type=int, default=30)
+    parser.add_argument('--rows', type=int, default=16)
+    parser.add_argument('--mines', type=int, default=99)
+    parser.add_argument('--count', type=int, default=10, help='number of boards the pool should have')
+    parser.add_argument('--workers', type=int, default=None, help='number of processes (default: all processors)')
+    parser.add_argument('--directory', default=POOL_DIR, help=f'directory of the pool (default: {POOL_DIR})')
+    arguments = parser.parse_args(argv)
+
+    pool = BoardPool(arguments.directory)
+    before = pool.count(arguments.columns, arguments.rows, arguments.mines)
+    start = time.perf_counter()
+    pool.fill(arguments.columns, arguments.rows, arguments.mines, arguments.count, arguments.workers)
+    elapsed = time.perf_counter() - start
+    generated = pool.count(arguments.columns, arguments.rows, arguments.mines) - before
+    print(f"{generated} boards generated in {elapsed:.2f} s, "
+          f"{pool.count(arguments.columns, arguments.rows, arguments.mines)} boards in the pool", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,163 @@
+"""Opt-in instrumentation of the hot paths of the game - how long reveals, win checks, drawing and Tk updates take,
+how big the floods are and how many canvas items are drawn.
+
+Instrumentation is switched on by 'enable', which wraps the measured methods of the classes, and switched off by
+'disable', which puts the original methods back. While it is disabled, the game runs the original code, so there
+is no overhead at all. For a full profile of a session use 'start_cprofile' and 'stop_cprofile'.
+"""
+import collections
+import functools
+import importlib
+import sys
+import time
+
+TIMERS = [
+    ('MineField', 'MineField', '_reveal'),
+    ('MineField', 'MineField', 'check_win'),
+    ('MineField', 'MineField', 'apply_moves'),
+    ('ArrayMineField', 'ArrayMineField', '_reveal'),
+    ('ArrayMineField', 'ArrayMineField', 'check_win'),
+    ('ArrayMineField', 'ArrayMineField', 'apply_moves'),
+    ('UI_tkinter', 'UI', 'draw'),
+    ('UI_tkinter', 'UI', '_draw_insides'),
+    ('UI_tkinter', 'UI', '_update_root'),
+]
+"""Measured methods - module, class and method. Time of every call is recorded under the name of the method.
+Classes of the UI are instrumented only if the module of the UI is already imported. Reveals are measured in
+'_reveal', which every reveal goes through, also the moves of 'apply_moves' and the chords."""
+
+SIZES = {
+    'apply_moves': 'changed_squares',
+    '_draw_insides': 'new_items',
+}
+"""Methods whose result is a collection, its length is recorded under the given name."""
+
+FLOODS = {
+    '_reveal': 'flood_size',
+}
+"""Methods that add the revealed squares to the collection passed as their last argument, the number of squares
+added by one call is recorded under the given name."""
+
+
+class Histogram:
+    """Count, sum, minimum, maximum and power of two buckets of recorded values."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.minimum = None
+        self.maximum = None
+        self.buckets = collections.Counter()
+        """Number of values for every bucket, bucket b holds values from 2 ** (b - 1) to 2 ** b."""
+        self.last = None
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        self.minimum = value if self.minimum is None else min(self.minimum, value)
+        self.maximum = value if self.maximum is None else max(self.maximum, value)
+        self.buckets[int(value).bit_length()] += 1
+        self.last = value
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0
+
+    def summary(self):
+        return {'count': self.count, 'mean': self.mean, 'min': self.minimum, 'max': self.maximum, 'last': self.last,
+                'buckets': dict(sorted(self.buckets.items()))}
+
+
+_histograms = collections.defaultdict(Histogram)
+_originals = {}
+_profiler = None
+
+
+def record(name, value):
+    """Adds a value (times are in microseconds) to the histogram 'name'."""
+    _histograms[name].add(value)
+
+
+def _instrument(function, name):
+    size_name = SIZES.get(name)
+    flood_name = FLOODS.get(name)
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        before = len(args[-1]) if flood_name is not None else 0
+        start = time.perf_counter()
+        result = function(*args, **kwargs)
+        record(name, (time.perf_counter() - start) * 1e6)
+        if size_name is not None and result is not None:
+            record(size_name, len(result))
+        if flood_name is not None:
+            record(flood_name, len(args[-1]) - before)
+        return result
+
+    return wrapper
+
+
+def is_enabled():
+    return bool(_originals)
+
+
+def enable():
+    """Starts measuring. It can be called again after the UI module is imported to instrument the UI as well."""
+    for module_name, class_name, method_name in TIMERS:
+        if (module_name, class_name, method_name) in _originals:
+            continue
+        if module_name == 'UI_tkinter' and module_name not in sys.modules:
+            continue
+        cls = getattr(importlib.import_module(module_name), class_name)
+        original = cls.__dict__[method_name]
+        _originals[(module_name, class_name, method_name)] = original
+        setattr(cls, method_name, _instrument(original, method_name))
+
+
+def disable():
+    """Stops measuring and restores the original methods. Recorded values are kept until 'reset'."""
+    for (module_name, class_name, method_name), original in _originals.items():
+        setattr(getattr(sys.modules[module_name], class_name), method_name, original)
+    _originals.clear()
+
+
+def reset():
+    _histograms.clear()
+
+
+def stats():
+    """Returns summaries of all the histograms by name (see 'Histogram.summary')."""
+    return {name: histogram.summary() for name, histogram in sorted(_histograms.items())}
+
+
+def overlay_text():
+    """Returns a short text with the last and mean values of the most important histograms."""
+    lines = []
+    for name, unit in (('apply_moves', 'us'), ('changed_squares', ''), ('_reveal', 'us'), ('flood_size', ''),
+                       ('draw', 'us'), ('_update_root', 'us')):
+        histogram = _histograms.get(name)
+        if histogram is not None and histogram.count:
+            lines.append(f"{name.strip('_')}: {histogram.last:.0f}{unit} (avg {histogram.mean:.0f}{unit})")
+    return '\n'.join(lines)
+
+
+def start_cprofile():
+    """Starts profiling of everything with cProfile, e.g. for the whole session of the game."""
+    global _profiler
+    import cProfile
+    _profiler = cProfile.Profile()
+    _profiler.enable()
+
+
+def stop_cprofile(path=None, sort='cumulative', limit=30):
+    """Stops cProfile, dumps the statistics to 'path' (if given, readable by 'pstats') and prints the top
+    'limit' functions sorted by 'sort'."""
+    global _profiler
+    if _profiler is None:
+        return
+    import pstats
+    _profiler.disable()
+    if path:
+        _profiler.dump_stats(path)
+    pstats.Stats(_profiler, stream=sys.stderr).sort_stats(sort).print_stats(limit)
+    _profiler = None
@@ -0,0 +1,166 @@
+"""Recording and deterministic replay of games.
+
+A recording is the seed, the dimensions and the number of mines of the field, the mode of the first click and
+the list of moves of the player. The field is generated from the seed again, so a replay ends in exactly the same
+state as the original game. In the file, the header (see HEADER) is followed by the moves, every move is one
+unsigned LEB128 varint of 'flat index * 4 + kind' (flat index is col * rows + row), so a move of a board up to
+32x32 takes 2 bytes.
+
+Replay a recorded game headless from the command line with:
+    python Recording.py game.minerec
+"""
+import argparse
+import struct
+import sys
+import time
+
+import ArrayMineField
+import MineField
+
+MAGIC = b'MREC'
+VERSION = 1
+FILE_EXTENSION = '.minerec'
+
+HEADER = struct.Struct('<4sHHIIIQI')
+"""Magic, version, flags (see below), columns, rows, number of mines, seed of the random generator and number
+of moves."""
+
+FLAG_FIRST_CLICK_SAFE = 0b01
+FLAG_FIRST_CLICK_ZERO = 0b10
+"""Flags of the header - mode of the first click of the field."""
+
+_KINDS = (MineField.MOVE_REVEAL, MineField.MOVE_FLAG, MineField.MOVE_CHORD)
+_KIND_CODES = {kind: code for code, kind in enumerate(_KINDS)}
+
+
+def encode_moves(moves, number_of_rows: int):
+    """Encodes moves (tuples of kind, column and row) into a stream of varints."""
+    data = bytearray()
+    for kind, col, row in moves:
+        value = (col * number_of_rows + row) << 2 | _KIND_CODES[kind]
+        while value > 0x7F:
+            data.append(value & 0x7F | 0x80)
+            value >>= 7
+        data.append(value)
+    return bytes(data)
+
+
+def decode_moves(data, number_of_rows: int, number_of_moves=None):
+    """Inverse of 'encode_moves' - returns the list of moves (tuples of kind, column and row)."""
+    moves = []
+    value = shift = 0
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        if value & 3 >= len(_KINDS):
+            raise ValueError(f"Unknown move {value & 3} in the stream of moves.")
+        col, row = divmod(value >> 2, number_of_rows)
+        moves.append((_KINDS[value & 3], col, row))
+        value = shift = 0
+    if shift or (number_of_moves is not None and len(moves) != number_of_moves):
+        raise ValueError("The stream of moves is truncated.")
+    return moves
+
+
+class Recording:
+    """Moves of one game together with everything needed to create its field again. The field has to be new when
+    the recording starts and its mines have to be generated from its seed (which is the case of every field
+    created without the parameter 'mines')."""
+
+    def __init__(self, number_of_columns: int, number_of_rows: int, number_of_mines: int, seed: int,
+                 first_click=None, moves=None):
+        self.number_of_columns = number_of_columns
+        self.number_of_rows = number_of_rows
+        self.number_of_mines = number_of_mines
+        self.seed = seed
+        self.first_click = first_click
+        self.moves = [] if moves is None else list(moves)
+        """List of moves, tuples of kind (see 'MineField.MOVE_REVEAL'), column and row."""
+
+    @classmethod
+    def from_field(cls, field):
+        """Starts an empty recording of a new field."""
+        number_of_columns, number_of_rows = field.get_dimensions()
+        return cls(number_of_columns, number_of_rows, field.number_of_mines, field.seed, field.first_click)
+
+    def record(self, kind, col: int, row: int):
+        self.moves.append((kind, col, row))
+
+    def new_field(self, field_class=ArrayMineField.ArrayMineField):
+        """Returns the field of the recording before the first move."""
+        return field_class(self.number_of_columns, self.number_of_rows, self.number_of_mines, seed=self.seed,
+                           first_click=self.first_click)
+
+    def replay(self, field_class=ArrayMineField.ArrayMineField):
+        """Replays all the moves at full speed (as one batch of 'apply_moves') and returns the field in the final
+        state of the game."""
+        field = self.new_field(field_class)
+        field.apply_moves(self.moves)
+        return field
+
+    def to_bytes(self):
+        flags = 0
+        if self.first_click == MineField.FIRST_CLICK_SAFE:
+            flags |= FLAG_FIRST_CLICK_SAFE
+        elif self.first_click == MineField.FIRST_CLICK_ZERO:
+            flags |= FLAG_FIRST_CLICK_ZERO
+        return HEADER.pack(MAGIC, VERSION, flags, self.number_of_columns, self.number_of_rows,
+                           self.number_of_mines, self.seed, len(self.moves)) + \
+            encode_moves(self.moves, self.number_of_rows)
+
+    @classmethod
+    def from_bytes(cls, data):
+        if len(data) < HEADER.size:
+            raise ValueError("Not a recorded game.")
+        magic, version, flags, number_of_columns, number_of_rows, number_of_mines, seed, number_of_moves = \
+            HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not a recorded game of version {VERSION}.")
+
+        first_click = None
+        if flags & FLAG_FIRST_CLICK_SAFE:
+            first_click = MineField.FIRST_CLICK_SAFE
+        elif flags & FLAG_FIRST_CLICK_ZERO:
+            first_click = MineField.FIRST_CLICK_ZERO
+        if not number_of_columns or not number_of_rows:
+            raise ValueError("The recorded field has no squares.")
+        moves = decode_moves(memoryview(data)[HEADER.size:], number_of_rows, number_of_moves)
+        if any(col >= number_of_columns for _, col, _ in moves):
+            raise ValueError("A recorded move is outside of the field.")
+        return cls(number_of_columns, number_of_rows, number_of_mines, seed, first_click, moves)
+
+    def save(self, path):
+        with open(path, 'wb') as file:
+            file.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as file:
+            return cls.from_bytes(file.read())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Replays a recorded game headless and prints how long it took.')
+    parser.add_argument('path')
+    parser.add_argument('--engine', choices=['array', 'list'], default='array',
+                        help='field implementation - ArrayMineField or MineField (default: array)')
+    arguments = parser.parse_args(argv)
+
+    field_class = ArrayMineField.ArrayMineField if arguments.engine == 'array' else MineField.MineField
+    start = time.perf_counter()
+    recording = Recording.load(arguments.path)
+    loaded = time.perf_counter()
+    field = recording.replay(field_class)
+    replayed = time.perf_counter()
+
+    result = 'lost' if field.boom else 'won' if field.check_win() else 'unfinished'
+    print(f"{recording.number_of_columns}x{recording.number_of_rows}, {recording.number_of_mines} mines, "
+          f"{len(recording.moves)} moves, {result}")
+    print(f"load {(loaded - start) * 1e3:.2f} ms, replay {(replayed - loaded) * 1e3:.2f} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
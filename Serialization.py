@@ -0,0 +1,164 @@
+"""Saving and loading of whole games in a compact binary format.
+
+File starts with a header (see HEADER) followed by three bit-packed layers - mines, revealed squares and flags.
+Every layer has one bit per square in the order of flat indices (col * rows + row), least significant bit first,
+padded to whole bytes. Files are read through 'mmap', so a single square or the header of a huge board can be
+inspected without reading the rest of the file.
+"""
+import glob
+import mmap
+import os
+import struct
+
+import ArrayMineField
+import Bitboard
+import MineField
+
+MAGIC = b'MINE'
+VERSION = 1
+FILE_EXTENSION = '.mines'
+
+HEADER = struct.Struct('<4sHHIIIQ')
+"""Magic, version, flags (see below), columns, rows, number of mines and seed of the random generator."""
+
+FLAG_BOOM = 0b001
+FLAG_MINES_PLACED = 0b010
+FLAG_FIRST_CLICK_ZERO = 0b100
+"""Flags of the header. If mines are not placed yet, the field was created with 'first_click' and the first
+click did not happen, FLAG_FIRST_CLICK_ZERO tells which mode was used."""
+
+LAYERS = ('mines', 'revealed', 'flagged')
+
+
+def pack_layer(layer: bytes):
+    """Packs a layer with one byte (0 or 1) per square into bits - the bytes of its bitboard (see 'Bitboard'),
+    so all the work is done in C."""
+    return Bitboard.from_layer(layer).to_bytes((len(layer) + 7) // 8, 'little')
+
+
+def unpack_layer(data: bytes, number_of_squares: int):
+    """Inverse of 'pack_layer' - returns bytes with one byte (0 or 1) per square."""
+    return Bitboard.to_layer(int.from_bytes(data, 'little'), number_of_squares)
+
+
+def _field_layers(field):
+    """Returns layers of mines, revealed squares and flags of the field, one byte per square."""
+    if isinstance(field, ArrayMineField.ArrayMineField):
+        return (field.layer(ArrayMineField.MINE), field.layer(ArrayMineField.REVEALED),
+                field.layer(ArrayMineField.FLAGGED))
+
+    # Any other field (e.g. MineField.MineField) is read square by square.
+    squares = [square for column in field.field for square in column]
+    return (bytes(square.is_mine for square in squares), bytes(square.is_revealed for square in squares),
+            bytes(square.is_flagged for square in squares))
+
+
+def save(field, path):
+    """Saves the state of the field (mines, revealed squares, flags and seed) into the file 'path'."""
+    number_of_columns, number_of_rows = field.get_dimensions()
+    flags = 0
+    if field.boom:
+        flags |= FLAG_BOOM
+    if field.mines_placed:
+        flags |= FLAG_MINES_PLACED
+    if field.first_click == MineField.FIRST_CLICK_ZERO:
+        flags |= FLAG_FIRST_CLICK_ZERO
+
+    with open(path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, flags, number_of_columns, number_of_rows, field.number_of_mines,
+                               field.seed))
+        for layer in _field_layers(field):
+            file.write(pack_layer(layer))
+
+
+class SavedBoard:
+    """Saved game opened through 'mmap'. Only the header is parsed when the file is opened, single squares are read
+    directly from the mapped file and whole layers are unpacked only when they are requested."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < HEADER.size:
+            self.close()
+            raise ValueError(f"{path} is not a saved game.")
+        magic, version, flags, self.number_of_columns, self.number_of_rows, self.number_of_mines, self.seed = \
+            HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a saved game of version {VERSION}.")
+
+        self.boom = bool(flags & FLAG_BOOM)
+        self.mines_placed = bool(flags & FLAG_MINES_PLACED)
+        self.first_click = None
+        if not self.mines_placed:
+            self.first_click = (MineField.FIRST_CLICK_ZERO if flags & FLAG_FIRST_CLICK_ZERO
+                                else MineField.FIRST_CLICK_SAFE)
+
+        self._layer_size = (self.number_of_columns * self.number_of_rows + 7) // 8
+        if len(self._map) < HEADER.size + len(LAYERS) * self._layer_size:
+            self.close()
+            raise ValueError(f"{path} is truncated.")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self._map.close()
+
+    def _offset(self, layer):
+        return HEADER.size + LAYERS.index(layer) * self._layer_size
+
+    def _bit(self, layer, col, row):
+        index = col * self.number_of_rows + row
+        return bool(self._map[self._offset(layer) + (index >> 3)] >> (index & 7) & 1)
+
+    def is_mine(self, col, row):
+        return self._bit('mines', col, row)
+
+    def is_revealed(self, col, row):
+        return self._bit('revealed', col, row)
+
+    def is_flagged(self, col, row):
+        return self._bit('flagged', col, row)
+
+    def count(self, layer):
+        """Returns the number of squares set in the layer ('mines', 'revealed' or 'flagged')."""
+        offset = self._offset(layer)
+        return int.from_bytes(self._map[offset:offset + self._layer_size], 'little').bit_count()
+
+    def layer(self, layer):
+        """Returns the layer ('mines', 'revealed' or 'flagged') with one byte (0 or 1) per square."""
+        offset = self._offset(layer)
+        return unpack_layer(self._map[offset:offset + self._layer_size], self.number_of_columns * self.number_of_rows)
+
+    def to_field(self, field_class=ArrayMineField.ArrayMineField):
+        """Returns a field with the saved state, ready to continue the game.
+        :param field_class: Implementation of the field, a class with the class method 'from_layers'.
+        (Default: ArrayMineField.ArrayMineField)"""
+        return field_class.from_layers(
+            self.number_of_columns, self.number_of_rows, self.number_of_mines, self.layer('mines'),
+            self.layer('revealed'), self.layer('flagged'), seed=self.seed, boom=self.boom,
+            first_click=self.first_click, mines_placed=self.mines_placed)
+
+
+def load(path, field_class=ArrayMineField.ArrayMineField):
+    """Loads a saved game and returns it as an instance of 'field_class' (see 'SavedBoard.to_field')."""
+    with SavedBoard(path) as board:
+        return board.to_field(field_class)
+
+
+def iter_saved_boards(directory, pattern='*' + FILE_EXTENSION):
+    """Generator of all saved games in the directory (sorted by name) as opened 'SavedBoard' instances, e.g. for
+    statistics over thousands of boards. Every board is closed when the next one is requested, so keep only
+    the values read from it, not the board itself. Files that are not saved games are skipped."""
+    for path in sorted(glob.glob(os.path.join(directory, pattern))):
+        try:
+            board = SavedBoard(path)
+        except (ValueError, OSError):
+            continue
+        with board:
+            yield board
@@ -0,0 +1,287 @@
+"""Local game server - many games of 'ArrayMineField' in one process, driven over TCP or Unix sockets, e.g. by bots
+and load tests. There is no Tk involved.
+
+Protocol is JSON lines: every request is one JSON object on one line and the server answers every request with
+one JSON object on one line, in the same order. Squares are lists [col, row]. Requests:
+
+    {"op": "new", "columns": 9, "rows": 9, "mines": 10, "seed": 1, "first_click": "safe"}
+        -> {"session": "...", "columns": 9, "rows": 9, "mines": 10, "seed": 1}
+    {"op": "reveal", "session": "...", "squares": [[0, 0], [5, 3]]}
+    {"op": "flag", "session": "...", "squares": [[1, 1]]}
+    {"op": "chord", "session": "...", "squares": [[2, 2]]}
+    {"op": "moves", "session": "...", "moves": [["reveal", 0, 0], ["flag", 1, 1], ["chord", 2, 2]]}
+        -> {"changed": [[col, row, state], ...], "boom": false, "won": false}
+    {"op": "close", "session": "..."} -> {"closed": true}
+    {"op": "stats"} -> {"sessions": 1, "bytes": 2674}
+
+The answer to a move is only the delta - squares that changed, with states 0-8 (revealed number), MINE (revealed
+mine), FLAGGED and HIDDEN. Winning reveals the mines, so they are part of the delta of the winning move. Errors
+are answered with {"error": "..."}.
+
+Run the server with:
+    python Server.py --port 8765        or        python Server.py --unix /tmp/mines.sock
+"""
+import argparse
+import array
+import asyncio
+import collections
+import itertools
+import json
+import sys
+import time
+
+import ArrayMineField
+import MineField
+from NeighborIndex import NEIGHBORS
+
+MINE = 9
+FLAGGED = 10
+HIDDEN = 11
+"""States of squares in the answers to moves (numbers 0-8 are revealed safe squares)."""
+
+_MOVE_OPS = (MineField.MOVE_REVEAL, MineField.MOVE_FLAG, MineField.MOVE_CHORD)
+
+LINE_LIMIT = 2 ** 20
+"""Maximum length of one request or answer in bytes."""
+
+
+def memory_of_field(number_of_columns: int, number_of_rows: int):
+    """Returns the number of bytes a game of the given shape can take - one byte per square (and the sentinel) and
+    the index of neighbors (see 'NeighborIndex'), which the field builds on the first reveal. Fields of the same
+    shape may share the index, so this is an upper bound."""
+    number_of_squares = number_of_columns * number_of_rows
+    return number_of_squares + 1 + NEIGHBORS * array.array('i').itemsize * number_of_squares
+
+
+class Session:
+    """One game hosted by the server."""
+    __slots__ = ('field', 'memory', 'last_used')
+
+    def __init__(self, field):
+        self.field = field
+        columns, rows = field.get_dimensions()
+        self.memory = memory_of_field(columns, rows)
+        self.last_used = time.monotonic()
+
+
+class GameServer:
+    """Hosts games keyed by session id. Sessions unused for 'idle_timeout' seconds are evicted, and when the total
+    memory of all the games (see 'memory_of_field') would exceed 'max_bytes', the least recently used sessions are
+    evicted to make space for a new one."""
+
+    def __init__(self, idle_timeout=300.0, max_bytes=2 ** 30):
+        self.idle_timeout = idle_timeout
+        self.max_bytes = max_bytes
+        self._sessions = collections.OrderedDict()
+        """Sessions by id, the least recently used first."""
+        self._memory = 0
+        self._session_ids = itertools.count(1)
+        self._server = None
+        self._evictor = None
+
+    @property
+    def sessions(self):
+        return len(self._sessions)
+
+    async def start(self, host='127.0.0.1', port=0, unix_path=None):
+        """Starts listening on TCP 'host':'port' (port 0 chooses a free one) or on the Unix socket 'unix_path'.
+        Returns the address the server listens on."""
+        if unix_path is not None:
+            self._server = await asyncio.start_unix_server(self._handle_connection, unix_path, limit=LINE_LIMIT)
+        else:
+            self._server = await asyncio.start_server(self._handle_connection, host, port, limit=LINE_LIMIT)
+        self._evictor = asyncio.ensure_future(self._evict_idle_sessions())
+        return self._server.sockets[0].getsockname()
+
+    async def close(self):
+        self._evictor.cancel()
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def serve_forever(self):
+        await self._server.serve_forever()
+
+    async def _evict_idle_sessions(self):
+        while True:
+            await asyncio.sleep(max(self.idle_timeout / 4, 0.01))
+            deadline = time.monotonic() - self.idle_timeout
+            while self._sessions:
+                session_id, session = next(iter(self._sessions.items()))
+                if session.last_used > deadline:
+                    break
+                self._remove(session_id)
+
+    def _remove(self, session_id):
+        session = self._sessions.pop(session_id)
+        self._memory -= session.memory
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # Line longer than LINE_LIMIT, the rest of it may still be in the stream, so the connection ends.
+                    writer.write(json.dumps({'error': f"request longer than {LINE_LIMIT} bytes"}).encode() + b'\n')
+                    await writer.drain()
+                    break
+                if not line:
+                    break
+                try:
+                    answer = self.handle(json.loads(line))
+                except (ValueError, KeyError, TypeError, IndexError) as error:
+                    answer = {'error': f"{type(error).__name__}: {error}"}
+                writer.write(json.dumps(answer, separators=(',', ':')).encode() + b'\n')
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def handle(self, request):
+        """Handles one request (a dictionary, see the module docstring) and returns the answer."""
+        op = request['op']
+        if op == 'new':
+            return self._new(request)
+        if op == 'stats':
+            return {'sessions': len(self._sessions), 'bytes': self._memory}
+
+        session_id = request['session']
+        if session_id not in self._sessions:
+            raise KeyError(f"unknown session {session_id}")
+        if op == 'close':
+            self._remove(session_id)
+            return {'closed': True}
+
+        session = self._sessions[session_id]
+        session.last_used = time.monotonic()
+        self._sessions.move_to_end(session_id)
+        if op in _MOVE_OPS:
+            moves = [(op, col, row) for col, row in request['squares']]
+        elif op == 'moves':
+            moves = request['moves']
+        else:
+            raise ValueError(f"unknown op {op}")
+        return self._play(session.field, moves)
+
+    def _new(self, request):
+        columns, rows, mines, seed = request['columns'], request['rows'], request['mines'], request.get('seed')
+        if not all(type(value) is int for value in (columns, rows, mines)) or not (seed is None or type(seed) is int):
+            raise TypeError("columns, rows, mines and seed have to be integers")
+        if columns < 1 or rows < 1:
+            raise ValueError("the field needs at least one column and one row")
+        memory = memory_of_field(columns, rows)
+        if memory > self.max_bytes:
+            raise ValueError(f"the field would take more than {self.max_bytes} bytes")
+
+        # The field checks the number of mines and the mode of the first click. Sessions are evicted only after
+        # it is created, so that a rejected request does not end other games.
+        field = ArrayMineField.ArrayMineField(columns, rows, mines, seed=seed, first_click=request.get('first_click'))
+        while self._memory + memory > self.max_bytes:
+            self._remove(next(iter(self._sessions)))
+        session_id = format(next(self._session_ids), 'x')
+        self._sessions[session_id] = Session(field)
+        self._memory += memory
+        return {'session': session_id, 'columns': columns, 'rows': rows, 'mines': mines, 'seed': field.seed}
+
+    @staticmethod
+    def _play(field, moves):
+        """Applies the moves in one batch and returns the delta of changed squares."""
+        columns, rows = field.get_dimensions()
+        moves = [tuple(move) for move in moves]
+        for kind, col, row in moves:
+            if kind not in _MOVE_OPS:
+                raise ValueError(f"unknown move {kind}")
+            # Checked before any move is applied, so that a bad move does not leave a half-applied batch.
+            if type(col) is not int or type(row) is not int:
+                raise TypeError(f"square {col!r}, {row!r} is not a pair of integers")
+            if not (0 <= col < columns and 0 <= row < rows):
+                raise IndexError(f"square {col}, {row} is outside of the field")
+        changed = field.apply_moves(moves)
+
+        delta = []
+        for col, row in changed:
+            square = field.field[col][row]
+            if square.is_revealed:
+                state = MINE if square.is_mine else square.number
+            else:
+                state = FLAGGED if square.is_flagged else HIDDEN
+            delta.append([col, row, state])
+        return {'changed': delta, 'boom': field.boom, 'won': not field.boom and field.check_win()}
+
+
+class Client:
+    """Client of 'GameServer' for bots and load tests. Requests of one client are sent one after another."""
+
+    def __init__(self, reader, writer):
+        self._reader = reader
+        self._writer = writer
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    async def connect(cls, host='127.0.0.1', port=8765, unix_path=None):
+        if unix_path is not None:
+            reader, writer = await asyncio.open_unix_connection(unix_path, limit=LINE_LIMIT)
+        else:
+            reader, writer = await asyncio.open_connection(host, port, limit=LINE_LIMIT)
+        return cls(reader, writer)
+
+    async def close(self):
+        self._writer.close()
+        await self._writer.wait_closed()
+
+    async def request(self, **request):
+        """Sends a request and returns the answer. Raises RuntimeError if the server answers with an error."""
+        async with self._lock:
+            self._writer.write(json.dumps(request, separators=(',', ':')).encode() + b'\n')
+            await self._writer.drain()
+            answer = json.loads(await self._reader.readline())
+        if 'error' in answer:
+            raise RuntimeError(answer['error'])
+        return answer
+
+    async def new(self, columns, rows, mines, seed=None, first_click=None):
+        return await self.request(op='new', columns=columns, rows=rows, mines=mines, seed=seed,
+                                  first_click=first_click)
+
+    async def reveal(self, session, squares):
+        return await self.request(op='reveal', session=session, squares=squares)
+
+    async def flag(self, session, squares):
+        return await self.request(op='flag', session=session, squares=squares)
+
+    async def chord(self, session, squares):
+        return await self.request(op='chord', session=session, squares=squares)
+
+    async def moves(self, session, moves):
+        return await self.request(op='moves', session=session, moves=moves)
+
+    async def end(self, session):
+        return await self.request(op='close', session=session)
+
+
+async def _serve(arguments):
+    server = GameServer(idle_timeout=arguments.idle_timeout, max_bytes=arguments.max_bytes)
+    address = await server.start(arguments.host, arguments.port, arguments.unix)
+    print(f"Listening on {address}", file=sys.stderr)
+    await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Hosts many games of minesweeper for bots and load tests.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', default=None, help='listen on this Unix socket instead of TCP')
+    parser.add_argument('--idle-timeout', type=float, default=300.0, help='seconds before an unused game is evicted')
+    parser.add_argument('--max-bytes', type=int, default=2 ** 30,
+                        help='maximum memory of all the games together, including their indices of neighbors')
+    arguments = parser.parse_args(argv)
+    try:
+        asyncio.run(_serve(arguments))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
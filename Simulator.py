@@ -0,0 +1,137 @@
+"""Headless batch simulator - plays many games on 'ArrayMineField' without any UI and writes one line of CSV per game.
+Games are split into shards that run in a process pool, every game has its own seed, so any game can be replayed.
+
+Example (beginner board, 100 000 games of the random policy):
+    python Simulator.py --columns 9 --rows 9 --mines 10 --games 100000 --policy random --output results.csv
+"""
+import argparse
+import concurrent.futures
+import csv
+import os
+import random
+import sys
+import time
+
+import ArrayMineField
+import MineField
+import Solver
+
+
+class RandomPolicy:
+    """Policy that reveals squares in a random order until the game ends."""
+
+    def __init__(self, field, rng: random.Random):
+        self._field = field
+        number_of_columns, number_of_rows = field.get_dimensions()
+        self._order = [(col, row) for col in range(number_of_columns) for row in range(number_of_rows)]
+        rng.shuffle(self._order)
+
+    def next_move(self):
+        """Returns column and row of the next square to reveal."""
+        while True:
+            col, row = self._order.pop()
+            if not self._field.field[col][row].is_revealed:
+                return col, row
+
+    def update(self, revealed):
+        """Is called with the set of squares revealed by the last move."""
+
+
+class SolverPolicy(RandomPolicy):
+    """Deterministic policy that reveals squares found safe by 'Solver.Solver'. When there is none, it reveals
+    the square with the lowest probability of a mine."""
+
+    def __init__(self, field, rng: random.Random):
+        super().__init__(field, rng)
+        self._solver = Solver.Solver(field)
+
+    def next_move(self):
+        square, _ = self._solver.hint()
+        if square is None:
+            return super().next_move()
+        return square
+
+    def update(self, revealed):
+        self._solver.update(revealed)
+
+
+POLICIES = {'random': RandomPolicy, 'solver': SolverPolicy}
+"""Available policies by name. A policy is a class with a constructor taking the field and a random generator,
+method 'next_move' returning the next square to reveal and method 'update' that receives the revealed squares."""
+
+CSV_HEADER = ['seed', 'won', 'moves', 'revealed']
+
+
+def play_game(number_of_columns, number_of_rows, number_of_mines, policy, seed, first_click=MineField.FIRST_CLICK_SAFE):
+    """Plays one game and returns a tuple of seed, whether the game was won (1 or 0), number of moves and number of
+    revealed safe squares. The policy gets its own random generator derived from the seed, so that its choices are
+    not correlated with the mines."""
+    field = ArrayMineField.ArrayMineField(number_of_columns, number_of_rows, number_of_mines, seed=seed,
+                                          first_click=first_click)
+    player = POLICIES[policy](field, random.Random(f'policy-{seed}'))
+    moves = 0
+    revealed = 0
+    while not field.boom and not field.check_win():
+        col, row = player.next_move()
+        squares = field.reveal(col, row)
+        moves += 1
+        if not field.boom:
+            revealed += len(squares)
+        player.update(squares)
+    return seed, int(not field.boom), moves, revealed
+
+
+def _play_shard(arguments):
+    """Plays games with seeds from 'first_seed' to 'last_seed' (excluded) in one worker process."""
+    number_of_columns, number_of_rows, number_of_mines, policy, first_seed, last_seed = arguments
+    return [play_game(number_of_columns, number_of_rows, number_of_mines, policy, seed)
+            for seed in range(first_seed, last_seed)]
+
+
+def simulate(number_of_columns, number_of_rows, number_of_mines, games, policy='random', seed=0, workers=None,
+             shard_size=1000):
+    """Generator of results of 'games' games (see 'play_game'), game i uses seed 'seed + i'. Results are yielded in
+    the order of seeds as soon as their shard is finished.
+    :param workers: Number of worker processes. (Default: None - number of processors)
+    :param shard_size: Number of games played by a worker in one task. (Default: 1000)"""
+    shards = [(number_of_columns, number_of_rows, number_of_mines, policy, first_seed,
+               min(first_seed + shard_size, seed + games))
+              for first_seed in range(seed, seed + games, shard_size)]
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        for results in executor.map(_play_shard, shards):
+            yield from results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Plays many games of minesweeper without UI.')
+    parser.add_argument('--columns', type=int, default=9)
+    parser.add_argument('--rows', type=int, default=9)
+    parser.add_argument('--mines', type=int, default=10)
+    parser.add_argument('--games', type=int, default=10000)
+    parser.add_argument('--policy', choices=sorted(POLICIES), default='random')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the first game, game i uses seed + i')
+    parser.add_argument('--workers', type=int, default=None, help='number of processes (default: all processors)')
+    parser.add_argument('--shard-size', type=int, default=1000, help='number of games in one task of a worker')
+    parser.add_argument('--output', default=None, help='CSV file for the results (default: no output)')
+    arguments = parser.parse_args(argv)
+
+    output = open(arguments.output, 'w', newline='') if arguments.output else open(os.devnull, 'w')
+    with output:
+        writer = csv.writer(output)
+        writer.writerow(CSV_HEADER)
+        start = time.perf_counter()
+        games = won = 0
+        for result in simulate(arguments.columns, arguments.rows, arguments.mines, arguments.games,
+                               arguments.policy, arguments.seed, arguments.workers, arguments.shard_size):
+            writer.writerow(result)
+            games += 1
+            won += result[1]
+        elapsed = time.perf_counter() - start
+
+    print(f"{games} games in {elapsed:.2f} s ({games / elapsed:.0f} games/s), "
+          f"win rate {won / max(games, 1):.2%}", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,328 @@
+import itertools
+import math
+
+MAX_ENUMERATED_SQUARES = 24
+"""Connected parts of the frontier with more undecided squares than this are not enumerated (it would take too
+long), only the single-square and subset rules are used for them."""
+
+
+def _combinations(n, k):
+    """Binomial coefficient that is zero instead of an error for k outside of 0..n."""
+    if k < 0 or k > n:
+        return 0
+    return math.comb(n, k)
+
+
+def _convolve(first, second):
+    """Multiplies two polynomials given as dictionaries {number of mines: number of solutions}."""
+    result = {}
+    for first_mines, first_count in first.items():
+        for second_mines, second_count in second.items():
+            result[first_mines + second_mines] = result.get(first_mines + second_mines, 0) + first_count * second_count
+    return result
+
+
+class Solver:
+    """Finds squares of a field that are certainly safe or certainly mines, using only what a player can see -
+    numbers of revealed squares (flags of the player are ignored, they might be wrong).
+
+    The solver is incremental. After every move call 'update' with the squares that were revealed, then only
+    numbers around them are checked again. Numbers are checked by the single-square rule and by the subset rule
+    (the hidden neighbors of one number are a subset of the hidden neighbors of another one). If that is not enough,
+    every connected part of the frontier is enumerated exactly, which also gives the probability of a mine
+    for every frontier square. Squares are tuples of column and row."""
+
+    def __init__(self, field):
+        self._field = field
+        self._num_of_columns, self._num_of_rows = field.get_dimensions()
+
+        self._revealed = set()
+        """Revealed squares the solver already knows about."""
+
+        self._mines = set()
+        """Hidden squares that are certainly mines."""
+
+        self._safe = set()
+        """Hidden squares that are certainly safe."""
+
+        self._frontier = set()
+        """Revealed squares with a number that still have an undecided hidden neighbor."""
+
+        self._dirty = set()
+        """Squares of the frontier whose neighborhood changed since they were checked the last time."""
+
+        self._components = {}
+        """Results of the enumeration of parts of the frontier, so that unchanged parts are not enumerated again."""
+
+        self._probabilities = {}
+        """Probabilities of a mine of the undecided frontier squares from the last enumeration."""
+
+        self._other_probability = None
+        """Probability of a mine of undecided squares that do not touch any number."""
+
+        self.update()
+
+    @property
+    def safe_squares(self):
+        return set(self._safe)
+
+    @property
+    def mines(self):
+        return set(self._mines)
+
+    def _neighbors(self, col, row):
+        return [(c, r)
+                for c in range(max(col - 1, 0), min(col + 1, self._num_of_columns - 1) + 1)
+                for r in range(max(row - 1, 0), min(row + 1, self._num_of_rows - 1) + 1)
+                if c != col or r != row]
+
+    def update(self, revealed=None):
+        """Tells the solver which squares were revealed by the last move.
+        :param revealed: Set of revealed squares as returned by 'reveal' of the field. Squares that are not revealed
+        (e.g. flags in the set returned by 'apply_moves') are skipped. (Default: None - the whole field is scanned,
+        which is done when the solver is created)"""
+        if revealed is None:
+            revealed = [(col, row) for col in range(self._num_of_columns) for row in range(self._num_of_rows)
+                        if self._field.field[col][row].is_revealed]
+        for square in revealed:
+            if square in self._revealed:
+                continue
+            square_state = self._field.field[square[0]][square[1]]
+            if not square_state.is_revealed or square_state.is_mine:
+                continue
+            self._revealed.add(square)
+            self._safe.discard(square)
+            self._touch(square)
+
+    def _touch(self, square):
+        """Marks the square and revealed numbers around it for checking."""
+        for col, row in self._neighbors(*square) + [square]:
+            if (col, row) in self._revealed and self._field.field[col][row].number > 0:
+                self._frontier.add((col, row))
+                self._dirty.add((col, row))
+
+    def _decide(self, square, is_mine):
+        if square in self._mines or square in self._safe:
+            return
+        (self._mines if is_mine else self._safe).add(square)
+        self._touch(square)
+
+    def _constraint(self, square):
+        """Returns the undecided hidden neighbors of a revealed number and how many mines are among them."""
+        unknown = []
+        mines = 0
+        for neighbor in self._neighbors(*square):
+            if neighbor in self._mines:
+                mines += 1
+            elif neighbor not in self._revealed and neighbor not in self._safe:
+                unknown.append(neighbor)
+        return unknown, self._field.field[square[0]][square[1]].number - mines
+
+    def _apply_rules(self):
+        """Checks the changed numbers with the single-square and subset rules until nothing new is found."""
+        while self._dirty:
+            square = self._dirty.pop()
+            unknown, value = self._constraint(square)
+            if not unknown:
+                self._frontier.discard(square)
+                continue
+            if value == 0 or value == len(unknown):
+                for neighbor in unknown:
+                    self._decide(neighbor, value > 0)
+                continue
+
+            unknown = set(unknown)
+            col, row = square
+            for other in [(c, r) for c in range(col - 2, col + 3) for r in range(row - 2, row + 3)
+                          if (c, r) in self._frontier and (c, r) != square]:
+                other_unknown, other_value = self._constraint(other)
+                other_unknown = set(other_unknown)
+                if unknown < other_unknown:
+                    self._apply_subset(other_unknown - unknown, other_value - value)
+                elif other_unknown < unknown:
+                    self._apply_subset(unknown - other_unknown, value - other_value)
+
+    def _apply_subset(self, difference, mines):
+        if mines == 0 or mines == len(difference):
+            for square in difference:
+                self._decide(square, mines > 0)
+
+    @staticmethod
+    def _enumerate(squares, constraints):
+        """Enumerates all the placements of mines on 'squares' that satisfy 'constraints' (list of tuples of
+        the indices of squares and the number of mines among them). Returns dictionaries {number of mines: number
+        of solutions} and {number of mines: list of numbers of solutions in which the square is a mine}."""
+        square_constraints = [[] for _ in squares]
+        needed = []
+        left = []
+        for index, (indices, value) in enumerate(constraints):
+            for square in indices:
+                square_constraints[square].append(index)
+            needed.append(value)
+            left.append(len(indices))
+
+        counts = {}
+        square_counts = {}
+        assignment = [0] * len(squares)
+
+        def search(square, mines):
+            if square == len(squares):
+                counts[mines] = counts.get(mines, 0) + 1
+                per_square = square_counts.setdefault(mines, [0] * len(squares))
+                for index, is_mine in enumerate(assignment):
+                    per_square[index] += is_mine
+                return
+            for is_mine in (0, 1):
+                if all(0 <= needed[c] - is_mine <= left[c] - 1 for c in square_constraints[square]):
+                    for c in square_constraints[square]:
+                        needed[c] -= is_mine
+                        left[c] -= 1
+                    assignment[square] = is_mine
+                    search(square + 1, mines + is_mine)
+                    for c in square_constraints[square]:
+                        needed[c] += is_mine
+                        left[c] += 1
+            assignment[square] = 0
+
+        search(0, 0)
+        return counts, square_counts
+
+    def _enumerate_frontier(self):
+        """Enumerates every connected part of the frontier, decides squares that are mines in all or in none of
+        the solutions and computes probabilities of a mine. Returns whether anything new was decided."""
+        constraints = {}
+        for square in list(self._frontier):
+            unknown, value = self._constraint(square)
+            if unknown:
+                constraints[square] = (unknown, value)
+            else:
+                self._frontier.discard(square)
+
+        # Connected parts of the frontier - numbers are connected if they share an undecided square.
+        numbers_of_square = {}
+        for square, (unknown, _) in constraints.items():
+            for neighbor in unknown:
+                numbers_of_square.setdefault(neighbor, []).append(square)
+        components = []
+        visited = set()
+        for start in constraints:
+            if start in visited:
+                continue
+            visited.add(start)
+            stack = [start]
+            numbers = []
+            while stack:
+                square = stack.pop()
+                numbers.append(square)
+                for neighbor in constraints[square][0]:
+                    for other in numbers_of_square[neighbor]:
+                        if other not in visited:
+                            visited.add(other)
+                            stack.append(other)
+            components.append(sorted(numbers))
+
+        results = []
+        enumerated_squares = 0
+        decided = False
+        for numbers in components:
+            squares = sorted({neighbor for number in numbers for neighbor in constraints[number][0]})
+            if len(squares) > MAX_ENUMERATED_SQUARES:
+                continue
+            key = tuple((number, tuple(constraints[number][0]), constraints[number][1]) for number in numbers)
+            if key not in self._components:
+                index_of_square = {square: index for index, square in enumerate(squares)}
+                self._components[key] = self._enumerate(
+                    squares, [([index_of_square[square] for square in constraints[number][0]], constraints[number][1])
+                              for number in numbers])
+            counts, square_counts = self._components[key]
+            solutions = sum(counts.values())
+            if not solutions:
+                continue
+            for index, square in enumerate(squares):
+                mine_solutions = sum(per_square[index] for per_square in square_counts.values())
+                if mine_solutions == 0 or mine_solutions == solutions:
+                    self._decide(square, mine_solutions > 0)
+                    decided = True
+            results.append((squares, counts, square_counts))
+            enumerated_squares += len(squares)
+
+        self._compute_probabilities(results, enumerated_squares)
+        return decided
+
+    def _compute_probabilities(self, results, enumerated_squares):
+        """Combines the enumerated parts of the frontier with the number of mines that are left for the rest of
+        the field. Every solution is weighted by the number of ways the remaining mines can be placed elsewhere."""
+        self._probabilities = {}
+        self._other_probability = None
+        mines_left = self._field.number_of_mines - len(self._mines)
+        other_squares = (self._num_of_columns * self._num_of_rows - len(self._revealed) - len(self._mines)
+                         - len(self._safe) - enumerated_squares)
+
+        total = {0: 1}
+        for _, counts, _ in results:
+            total = _convolve(total, counts)
+        weight = sum(count * _combinations(other_squares, mines_left - mines) for mines, count in total.items())
+        if not weight:
+            return
+
+        for index, (squares, counts, square_counts) in enumerate(results):
+            others = {0: 1}
+            for other_index, (_, other_counts, _) in enumerate(results):
+                if other_index != index:
+                    others = _convolve(others, other_counts)
+            for square_index, square in enumerate(squares):
+                mine_weight = 0
+                for mines, per_square in square_counts.items():
+                    mine_weight += per_square[square_index] * sum(
+                        count * _combinations(other_squares, mines_left - mines - other_mines)
+                        for other_mines, count in others.items())
+                self._probabilities[square] = mine_weight / weight
+
+        if other_squares > 0:
+            expected_mines = sum(count * _combinations(other_squares, mines_left - mines) * (mines_left - mines)
+                                 for mines, count in total.items())
+            self._other_probability = expected_mines / weight / other_squares
+
+    def solve(self):
+        """Decides as many squares as possible. Returns sets of hidden squares that are certainly safe and
+        certainly mines."""
+        self._apply_rules()
+        while not self._safe and self._frontier and self._enumerate_frontier():
+            self._apply_rules()
+        return self.safe_squares, self.mines
+
+    def probabilities(self):
+        """Returns probabilities of a mine of the undecided frontier squares and of the squares that do not touch
+        any number (None if there are none) from the last exact enumeration."""
+        return dict(self._probabilities), self._other_probability
+
+    def hint(self):
+        """Returns the best square to reveal and the probability that it is a mine - a certainly safe square if
+        there is one, otherwise the square with the lowest probability of a mine. Returns (None, None) if there is
+        nothing to reveal."""
+        self.solve()
+        if self._safe:
+            return min(self._safe), 0.0
+        self._enumerate_frontier()  # Refreshes the probabilities, unchanged parts of the frontier are cached.
+
+        best, best_probability = None, None
+        if self._probabilities:
+            best = min(self._probabilities, key=self._probabilities.get)
+            best_probability = self._probabilities[best]
+        if best is None or (self._other_probability is not None and self._other_probability < best_probability):
+            other = self._other_square()
+            if other is not None:
+                best, best_probability = other, self._other_probability
+        return best, best_probability
+
+    def _other_square(self):
+        """Returns an undecided hidden square that does not touch any revealed number, preferring corners."""
+        corners = [(0, 0), (0, self._num_of_rows - 1), (self._num_of_columns - 1, 0),
+                   (self._num_of_columns - 1, self._num_of_rows - 1)]
+        squares = ((col, row) for col in range(self._num_of_columns) for row in range(self._num_of_rows))
+        for square in itertools.chain(corners, squares):
+            if square in self._revealed or square in self._mines or square in self._probabilities:
+                continue
+            if not any(neighbor in self._revealed for neighbor in self._neighbors(*square)):
+                return square
+        return None
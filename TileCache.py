@@ -0,0 +1,104 @@
+"""Images of tiles made only with Tk - PNG files are decoded by Tk itself and scaled by zooming and subsampling, numbers
+are drawn with a small pixel font. Pillow is not needed, so it is not imported and the game starts faster."""
+import os
+import sys
+import tkinter
+
+ASSETS_DIR = getattr(sys, '_MEIPASS', os.path.dirname(os.path.abspath(__file__)))
+"""Directory with the images. When the game is bundled by PyInstaller, the images are unpacked to 'sys._MEIPASS'."""
+
+ASSETS = {
+    'logo': 'logo.png',
+    'unrevealed': 'tile_square2.png',
+    'flagged': 'tile_square_flagged.png',
+    'mine_lose': 'mine_lose.png',
+    'mine_win': 'mine_win.png',
+}
+"""Names of the tiles loaded from files and their file names."""
+
+MAX_ZOOMED = 1600
+"""Largest size in pixels of the temporary zoomed asset (see 'scale'), unless the tile itself is larger."""
+
+
+def scale(asset_size: int, size: int):
+    """Returns zoom, subsample and offset with which an asset of 'asset_size' pixels covers a tile of 'size' pixels.
+    The asset is zoomed by 'zoom' and the result is subsampled by 'subsample', so the scale is the fraction
+    zoom / subsample - e.g. 3 / 5 for a tile of 60 pixels from an asset of 100 pixels, or 3 / 2 for a tile of 150
+    pixels. The smallest such fraction that covers the tile is chosen, so the tile may be a few pixels smaller than
+    the scaled asset - the extra pixels are clipped evenly from all sides, 'offset' is where the tile starts in the
+    zoomed asset."""
+    zoom, subsample = min(((zoom, asset_size * zoom // size)
+                           for zoom in range(1, max(MAX_ZOOMED // asset_size, -(-size // asset_size)) + 1)
+                           if asset_size * zoom >= size), key=lambda factors: (factors[0] / factors[1], factors[0]))
+    offset = (asset_size * zoom // subsample - size) // 2 * subsample
+    return zoom, subsample, offset
+
+
+class TileCache:
+    """Tk images of tiles for one Tk root window. The images are created on the first request and then reused,
+    e.g. after the game is reset or when tiles of several sizes are needed."""
+
+    def __init__(self, master):
+        self._master = master
+        self._decoded_images = {}
+        """Images of the assets in the size of the files, every file is decoded only once."""
+        self._photo_images = {}
+
+    def _load(self, name):
+        if name not in self._decoded_images:
+            self._decoded_images[name] = tkinter.PhotoImage(file=os.path.join(ASSETS_DIR, ASSETS[name]),
+                                                            master=self._master)
+        return self._decoded_images[name]
+
+    def _blank(self, size, color=None):
+        image = tkinter.PhotoImage(width=size, height=size, master=self._master)
+        if color is not None:
+            image.put(color, to=(0, 0, size, size))
+        return image
+
+    def _draw_asset(self, image, name, size, rule='overlay'):
+        """Draws the asset 'name' into the image - over it with the compositing rule 'overlay', or replacing its
+        pixels with 'set'. The asset is scaled up or down to cover the tile (see 'scale')."""
+        asset = self._load(name)
+        zoom, subsample, offset = scale(min(asset.width(), asset.height()), size)
+        if zoom > 1:
+            # Tk takes every subsample-th pixel before zooming, so both in one copy would lose the details.
+            zoomed = tkinter.PhotoImage(master=self._master)
+            zoomed.tk.call(zoomed, 'copy', asset, '-zoom', zoom, zoom)
+            asset = zoomed
+        image.tk.call(image, 'copy', asset, '-from', offset, offset, '-subsample', subsample, subsample,
+                      '-compositingrule', rule)
+
+    def _draw_number(self, image, number, size):
+        glyph = GLYPHS[number]
+        scale = max(size * 2 // 3 // len(glyph), 1)
+        left = (size - len(glyph[0]) * scale) // 2
+        top = (size - len(glyph) * scale) // 2
+        color = NUMBER_COLORS.get(number, 'red')
+        for y, line in enumerate(glyph):
+            for x, pixel in enumerate(line):
+                if pixel == '#':
+                    image.put(color, to=(left + x * scale, top + y * scale,
+                                         left + (x + 1) * scale, top + (y + 1) * scale))
+
+    def get(self, name, size):
+        """Returns a Tk image of the tile 'name' with 'size' x 'size' pixels.
+        :param name: Name of an asset (see ASSETS), 'revealed' for an empty revealed square or a number 1-8 for
+        a revealed square with that number.
+        :param size: Size of the tile in pixels."""
+        key = (name, size)
+        if key not in self._photo_images:
+            if name == 'revealed':
+                image = self._blank(size, REVEALED_COLOR)
+            elif isinstance(name, int):
+                image = self._blank(size, REVEALED_COLOR)
+                self._draw_number(image, name, size)
+            elif name in ('mine_lose', 'mine_win'):
+                # Mines are only shown on revealed squares.
+                image = self._blank(size, REVEALED_COLOR)
+                self._draw_asset(image, name, size)
+            else:
+                image = self._blank(size)
+                self._draw_asset(image, name, size, 'set')
+            self._photo_images[key] = image
+        return self._photo_images[key]
@@ -1,9 +1,11 @@
 import tkinter
-import tkinter.ttk
 import MineField
-from PIL import Image, ImageTk
-import PIL
-import time
+import Profiling
+import Recording
+import TileCache
+
+# Modules that are not needed for the first frame (dialogs, ttk widgets, the solver, saving and loading and
+# the thread pool) are imported only when they are used, so that the window is shown as soon as possible.
 
 
 class UI:
@@ -11,14 +13,21 @@ class UI:
     _row_size = 25
     _col_size = 25
 
+    # Bigger boards than this are scrolled. Canvas items exist only for the visible squares plus a margin of squares
+    # around them, so the number of items depends on the size of the window, not on the size of the board.
+    _max_view_width = 1000
+    _max_view_height = 700
+    _view_margin = 2
+
     def __init__(self, Field):
         self.root = tkinter.Tk()
         self.root.title('Minesweeper')
         self.root.resizable(False, False)
 
-        self.logo = (PIL.Image.open("logo.png"))
-        self.logo = self.logo.resize((18, 18), PIL.Image.ANTIALIAS)
-        self.logo = PIL.ImageTk.PhotoImage(self.logo)
+        self._tiles = TileCache.TileCache(self.root)
+        """Cached images of tiles, shared by all fields shown in this window."""
+
+        self.logo = self._tiles.get('logo', 18)
         self.root.iconphoto(False, self.logo)
 
         # MENU
@@ -30,32 +39,98 @@ class UI:
 
         # Assign MineField instance to a class variable and assing the important parameters
         self.Field = Field
+        self._field_class = type(Field)
+        """Implementation of the field (MineField or ArrayMineField) the UI was started with. New, loaded and replayed
+        games use it too, boards without guessing are always ArrayMineField."""
         self._number_of_columns, self._number_of_rows = self.Field.get_dimensions()
         self._number_of_mines = self.Field.number_of_mines
 
-        # Set up the canvas of the field
+        # Set up the canvas of the field. '_width_of_canvas' and '_height_of_canvas' are sizes of the whole board,
+        # '_width_of_view' and '_height_of_view' are sizes of the visible part of it.
         self._width_of_canvas = self._number_of_columns * self._col_size + 1
         self._height_of_canvas = self._number_of_rows * self._row_size + 1
-        self._canvas_field = tkinter.Canvas(self.root, width=self._width_of_canvas, height=self._height_of_canvas,
-                                            background='white')
+        self._width_of_view = min(self._width_of_canvas, self._max_view_width)
+        self._height_of_view = min(self._height_of_canvas, self._max_view_height)
+        self._canvas_field = tkinter.Canvas(self.root, width=self._width_of_view, height=self._height_of_view,
+                                            background='white',
+                                            xscrollincrement=self._col_size, yscrollincrement=self._row_size,
+                                            scrollregion=(0, 0, self._width_of_canvas, self._height_of_canvas))
         self._canvas_field.grid(column=0, row=1)
         self._canvas_field.bind("<Button-1>", self.reveal)
         self._canvas_field.bind("<Button-3>", self.toggle_flag)
+        self._canvas_field.bind("<Button-2>", self.chord)
+        self._canvas_field.bind("<Double-Button-1>", self.chord)
+        self._canvas_field.bind("<MouseWheel>", lambda event: self._scroll('y', -event.delta // 120))
+        self._canvas_field.bind("<Shift-MouseWheel>", lambda event: self._scroll('x', -event.delta // 120))
+        self._canvas_field.bind("<Button-4>", lambda event: self._scroll('y', -1))
+        self._canvas_field.bind("<Button-5>", lambda event: self._scroll('y', 1))
+
+        # Scrollbars are shown only if the board does not fit into the view.
+        self._x_scrollbar = tkinter.Scrollbar(self.root, orient='horizontal', command=self._x_view)
+        self._y_scrollbar = tkinter.Scrollbar(self.root, orient='vertical', command=self._y_view)
+        self._x_scrollbar.grid(column=0, row=2, sticky='we')
+        self._y_scrollbar.grid(column=1, row=1, sticky='ns')
+        self._canvas_field.config(xscrollcommand=self._x_scrollbar.set, yscrollcommand=self._y_scrollbar.set)
+        self._show_scrollbars()
 
         # Set up the canvas of the upper bar
-        self._canvas_info = tkinter.Canvas(self.root, width=self._width_of_canvas, height=40)
+        self._canvas_info = tkinter.Canvas(self.root, width=self._width_of_view, height=40)
         self._canvas_info.grid(column=0, row=0)
         self.timer_text = self._canvas_info.create_text(80, 20, text="Mines to find: "+str(self.Field.number_of_mines),
                                                         fill="black",
                                                         font='Helvetica 14 bold')
 
-        # Images of tiles
+        # Images of tiles, only the image of unrevealed squares is needed for the first frame. The other ones are
+        # created by '_tile' when they are drawn for the first time.
         self.unrevealed_image = None
-        self.flagged_image = None
-        self.mine_lose_image = None
-        self.mine_win_image = None
         self._import_images()
 
+        self._square_items = {}
+        """Canvas items of the squares in the view - dictionary from tuple of column and row to an image item.
+        Items are only moved and reconfigured when the view is scrolled, not created anew."""
+
+        self._free_items = []
+        """Items of squares that left the view, they are reused for squares that enter it."""
+
+        self._overlay_label = None
+        """Label of the debug overlay in its own row under the board, it is created when the overlay is turned on."""
+
+        self._drawn_view = None
+        """Range of columns and rows (col_from, col_to, row_from, row_to) that have items in '_square_items'."""
+
+        self._drawn_field = None
+        """Field for which the items in '_square_items' were drawn."""
+
+        self._solver = None
+        """Solver of the current field, it is created when the player asks for a hint for the first time."""
+
+        self._recording = Recording.Recording.from_field(self.Field)
+        """Moves of the current game, None if the game can not be recorded (it was loaded from a saved game)."""
+
+        self._replay = None
+        """Iterator of the moves that are still to be shown by the running replay."""
+
+        # New fields are generated in a background thread, so that the window keeps responding.
+        self._generator = None
+        """Thread pool of the generator, it is started after the first frame is shown."""
+
+        self._pending_field = None
+        """Future of the field that will replace the current one when it is generated."""
+
+        self._next_field = None
+        """Tuple of the parameters (class, columns, rows, mines) and the future of a field generated in advance for
+        the next reset with the same settings."""
+
+        self._searcher = None
+        """'NoGuess.Searcher' of boards that can be solved without guessing, it is started when the option is turned
+        on for the first time and kept, so that its worker processes are reused."""
+
+        self._board_pool = None
+        """'NoGuess.BoardPool' of ready boards that can be solved without guessing."""
+
+        self._progress = None
+        """Progress bar shown while a field is generated, it is created when it is needed for the first time."""
+
         #self.start_timer(0)
 
         # self.num_of_cols = tkinter.IntVar(value=self._number_of_columns)
@@ -64,6 +139,7 @@ class UI:
 
 
         self.draw()
+        self.root.after_idle(self._generate_next_field)
 
     def start_timer(self, secs):
         self._canvas_info.itemconfig(self.timer_text, text=f"{secs:02}")
@@ -74,95 +150,388 @@ class UI:
 
         self._game_menu = tkinter.Menu(self._menubar, tearoff=0)
         self._game_menu.add_command(label="Reset", command=lambda: self.reset(False), accelerator="F5")
+        self._game_menu.add_command(label="Hint", command=self.hint, accelerator="H")
+        self._game_menu.add_separator()
+        self._game_menu.add_command(label="Save...", command=self.save, accelerator="Ctrl+S")
+        self._game_menu.add_command(label="Load...", command=self.load, accelerator="Ctrl+O")
+        self._game_menu.add_command(label="Save recording...", command=self.save_recording)
+        self._game_menu.add_command(label="Replay...", command=self.replay)
         self._game_menu.add_separator()
         self._game_menu.add_command(label="Exit", command=self.root.quit, accelerator="Ctrl+Q")
         self._menubar.add_cascade(label="Game", menu=self._game_menu)
 
-        self._settings = tkinter.Menu(self._menubar, tearoff=0)
-        self._settings.add_command(label="Default settings", command=lambda: self.reset(True))
-        self._settings.add_command(label="Customize", command=lambda: self._ask_params())
-        self._menubar.add_cascade(label="Options", menu=self._settings)
-
-        self._help_menu = tkinter.Menu(self._menubar, tearoff=0)
-        self._help_menu.add_command(label="Rules")
-        self._help_menu.add_command(label="About...")
-        self._menubar.add_cascade(label="Help", menu=self._help_menu)
+        self._debug_overlay = tkinter.BooleanVar(self.root, value=Profiling.is_enabled())
+        self._no_guess = tkinter.BooleanVar(self.root, value=False)
+        """Whether new games are generated so that they can be solved without guessing (see 'NoGuess')."""
+        self._settings = self._lazy_menu("Options", self._fill_settings_menu)
+        self._help_menu = self._lazy_menu("Help", self._fill_help_menu)
 
         self.root.config(menu=self._menubar)
 
         # Keyboard shortcuts
         self.root.bind_all("<Control-q>", lambda event: self.root.quit())
         self.root.bind_all("<F5>", lambda event: self.reset(False))
+        # Bound only to the main window, so that typing "h" in a dialog (e.g. a file name) does not ask for a hint.
+        self.root.bind("<h>", lambda event: self.hint())
+        self.root.bind_all("<Control-s>", lambda event: self.save())
+        self.root.bind_all("<Control-o>", lambda event: self.load())
+
+    def _lazy_menu(self, label, fill):
+        """Adds a cascade to the menu bar, its items are added by 'fill' when it is opened for the first time."""
+        menu = tkinter.Menu(self._menubar, tearoff=0)
+
+        def post():
+            if menu.index('end') is None:
+                fill(menu)
+
+        menu.config(postcommand=post)
+        self._menubar.add_cascade(label=label, menu=menu)
+        return menu
+
+    def _fill_settings_menu(self, menu):
+        menu.add_command(label="Default settings", command=lambda: self.reset(True))
+        menu.add_command(label="Customize", command=lambda: self._ask_params())
+        menu.add_checkbutton(label="No guessing", variable=self._no_guess, command=self._generate_next_field)
+        menu.add_separator()
+        menu.add_checkbutton(label="Debug overlay", variable=self._debug_overlay, command=self._toggle_debug_overlay)
+
+    def _fill_help_menu(self, menu):
+        menu.add_command(label="Rules")
+        menu.add_command(label="About...")
+
+    def _toggle_debug_overlay(self):
+        """Switches the instrumentation of the game on and off, the measured values are shown in the upper bar."""
+        if self._debug_overlay.get():
+            Profiling.enable()
+        else:
+            Profiling.disable()
+        self.draw_info()
 
     def _import_images(self):
-        size = self._col_size - 1
-
-        unrevealed_img = (Image.open("tile_square2.png"))
-        resized_unrevealed_img = unrevealed_img.resize((size, size), Image.ANTIALIAS)
-        self.unrevealed_image = ImageTk.PhotoImage(resized_unrevealed_img)
-
-        flagged_img = (Image.open("tile_square_flagged.png"))
-        resized_flagged_img = flagged_img.resize((size, size), Image.ANTIALIAS)
-        self.flagged_image = ImageTk.PhotoImage(resized_flagged_img)
-
-        mine_lose_img = (Image.open("mine_lose.png"))
-        resized_mine_lose_img = mine_lose_img.resize((size, size), Image.ANTIALIAS)
-        self.mine_lose_image = ImageTk.PhotoImage(resized_mine_lose_img)
+        self.unrevealed_image = self._tile('unrevealed')
 
-        mine_win_img = (Image.open("mine_win.png"))
-        resized_mine_win_img = mine_win_img.resize((size, size), Image.ANTIALIAS)
-        self.mine_win_image = ImageTk.PhotoImage(resized_mine_win_img)
+    def _tile(self, name):
+        """Returns the image of the tile 'name' (see 'TileCache.TileCache.get') in the size of a square."""
+        return self._tiles.get(name, self._col_size - 1)
 
     def set_canvas(self):
         self._width_of_canvas = self._number_of_columns * self._col_size + 1
         self._height_of_canvas = self._number_of_rows * self._row_size + 1
-        self._canvas_field.config(width=self._width_of_canvas, height=self._height_of_canvas)
+        self._width_of_view = min(self._width_of_canvas, self._max_view_width)
+        self._height_of_view = min(self._height_of_canvas, self._max_view_height)
+        self._canvas_field.config(width=self._width_of_view, height=self._height_of_view,
+                                  scrollregion=(0, 0, self._width_of_canvas, self._height_of_canvas))
+        self._canvas_info.config(width=self._width_of_view)
+        self._canvas_field.xview_moveto(0)
+        self._canvas_field.yview_moveto(0)
+        self._show_scrollbars()
+
+    def _show_scrollbars(self):
+        """Shows only the scrollbars that are needed for the current size of the board."""
+        if self._width_of_canvas > self._width_of_view:
+            self._x_scrollbar.grid()
+        else:
+            self._x_scrollbar.grid_remove()
+        if self._height_of_canvas > self._height_of_view:
+            self._y_scrollbar.grid()
+        else:
+            self._y_scrollbar.grid_remove()
+
+    def _x_view(self, *args):
+        """Command of the horizontal scrollbar."""
+        self._canvas_field.xview(*args)
+        self._update_view()
+
+    def _y_view(self, *args):
+        """Command of the vertical scrollbar."""
+        self._canvas_field.yview(*args)
+        self._update_view()
+
+    def _scroll(self, axis, units):
+        """Scrolls the view by 'units' squares along 'axis' ('x' or 'y'), e.g. with the mouse wheel."""
+        if axis == 'x':
+            self._canvas_field.xview_scroll(units, 'units')
+        else:
+            self._canvas_field.yview_scroll(units, 'units')
+        self._update_view()
 
     def reset(self, default=True, new_params=None):
+        """Starts a new game. The new field is generated in the background (or taken from the one generated in
+        advance) and it replaces the current one when it is ready, meanwhile a progress bar is shown."""
+        columns, rows, mines = self._number_of_columns, self._number_of_rows, self._number_of_mines
         if default:
-            self._number_of_rows = 10
-            self._number_of_columns = 10
-            self._number_of_mines = 10
-
-        if new_params is None:
-            new_params = [self._number_of_columns, self._number_of_rows, self._number_of_mines]
-
-        if not default:
-            self._number_of_rows = new_params[1]
-            self._number_of_columns = new_params[0]
-            self._number_of_mines = new_params[2]
+            columns, rows, mines = 10, 10, 10
+
+        if new_params is not None and not default:
+            columns, rows, mines = new_params
+
+        params = self._field_params(columns, rows, mines)
+        if self._pending_field is not None:
+            self._cancel(self._pending_field)  # Replaced by this reset.
+        if self._next_field is not None and self._next_field[0] == params and params[0] != self._no_guess_board:
+            future = self._next_field[1]
+        else:
+            if self._next_field is not None and self._next_field[0] != params:
+                self._cancel(self._next_field[1])  # Not needed any more.
+            # A board without guessing is taken from the pool. If the pool is being refilled, the task runs after
+            # the refill and takes the board it added.
+            future = self._submit(params)
+        self._next_field = None
+        self._pending_field = future
+        self._replay = None
+
+        if not future.done():
+            if self._progress is None:
+                import tkinter.ttk
+                self._progress = tkinter.ttk.Progressbar(self._canvas_info, mode='indeterminate', length=80)
+            self._canvas_info.delete('all')
+            self._canvas_info.create_text(8, 20, text="Generating...", anchor='w', font='Helvetica 12')
+            self._canvas_info.create_window(self._width_of_view - 8, 20, window=self._progress, anchor='e')
+            self._progress.start(10)
+        self._wait_for_field(future, params)
+
+    def _wait_for_field(self, future, params):
+        """Checks periodically whether the field is generated and then shows it."""
+        if future is not self._pending_field:
+            return  # Another reset or load came in the meantime.
+        if not future.done():
+            self.root.after(50, self._wait_for_field, future, params)
+            return
 
+        self._stop_progress()
+        self._pending_field = None
+        try:
+            field = future.result()
+        except ValueError as error:
+            import tkinter.messagebox
+            tkinter.messagebox.showerror("Customize", str(error), parent=self.root)
+            self.draw()
+            return
+        self._show_field(field)
+        if params[0] == self._no_guess_board:
+            import NoGuess
+            # The board comes with the start square revealed, the recording starts with the same first click.
+            self._recording = NoGuess.recording(field)
+
+    def _show_field(self, field):
+        """Replaces the current field with a new one and starts generating the next one in advance."""
         del self.Field
-        self.Field = MineField.MineField(self._number_of_columns, self._number_of_rows, self._number_of_mines)
+        self.Field = field
+        self._number_of_columns, self._number_of_rows = self.Field.get_dimensions()
+        self._number_of_mines = self.Field.number_of_mines
+        self._solver = None
+        self._recording = Recording.Recording.from_field(self.Field)
+        self._replay = None
 
         self.set_canvas()
 
         self.draw()
+        self._generate_next_field()
+
+    def _generate_next_field(self):
+        """Starts generating a field with the current settings, so that the next reset is instant. Boards without
+        guessing are added to the pool instead."""
+        if self._next_field is not None:
+            self._cancel(self._next_field[1])
+        params = self._field_params(self._number_of_columns, self._number_of_rows, self._number_of_mines)
+        if params[0] == self._no_guess_board:
+            self._next_field = (params, self._submit((self._refill_board_pool, *params[1:])))
+        else:
+            self._next_field = (params, self._submit(params))
+
+    def _field_params(self, columns, rows, mines):
+        """Returns the parameters (function, columns, rows, mines) of generating a field with the settings."""
+        if self._no_guess.get():
+            if self._searcher is None:
+                import NoGuess
+                self._searcher = NoGuess.Searcher()
+                self._board_pool = NoGuess.BoardPool()
+            return self._no_guess_board, columns, rows, mines
+        return self._field_class, columns, rows, mines
+
+    def _no_guess_board(self, columns, rows, mines):
+        """Runs in the generator thread - returns a board without guessing from the pool or a newly searched one."""
+        import NoGuess
+        return NoGuess.board(columns, rows, mines, self._board_pool, self._searcher)
+
+    def _refill_board_pool(self, columns, rows, mines):
+        """Runs in the generator thread - adds a board without guessing to the pool if it is empty, so that the next
+        reset is instant."""
+        self._board_pool.fill(columns, rows, mines, 1, searcher=self._searcher)
+
+    def _cancel(self, future):
+        """Cancels generating of a field that is not needed any more. If it is already running, it can only be
+        a search of a board without guessing that takes long, which is cancelled as well, so that it does not block
+        the generator thread."""
+        if not future.cancel() and not future.done() and self._searcher is not None:
+            self._searcher.cancel()
+
+    def close(self):
+        """Stops generating fields, so that the process does not wait for a running search when it exits."""
+        if self._searcher is not None:
+            self._searcher.close()
+        if self._generator is not None:
+            self._generator.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, params):
+        """Starts generating a field with the parameters (function, columns, rows, mines), returns its future."""
+        if self._generator is None:
+            import concurrent.futures
+            self._generator = concurrent.futures.ThreadPoolExecutor(max_workers=1,
+                                                                    thread_name_prefix='field-generator')
+        return self._generator.submit(*params)
+
+    def _stop_progress(self):
+        if self._progress is not None:
+            self._progress.stop()
+
+    def save(self):
+        import tkinter.filedialog
+        import Serialization
+        path = tkinter.filedialog.asksaveasfilename(parent=self.root, defaultextension=Serialization.FILE_EXTENSION,
+                                                    filetypes=[("Saved games", "*" + Serialization.FILE_EXTENSION)])
+        if not path: return
+
+        Serialization.save(self.Field, path)
+
+    def load(self):
+        import tkinter.filedialog
+        import tkinter.messagebox
+        import Serialization
+        path = tkinter.filedialog.askopenfilename(parent=self.root,
+                                                  filetypes=[("Saved games", "*" + Serialization.FILE_EXTENSION)])
+        if not path: return
+        try:
+            field = Serialization.load(path, self._field_class)
+        except (ValueError, OSError) as error:
+            tkinter.messagebox.showerror("Load", str(error), parent=self.root)
+            return
+
+        # The loaded game replaces the one that is being generated.
+        if self._pending_field is not None:
+            self._cancel(self._pending_field)
+            self._pending_field = None
+        self._stop_progress()
+        self._show_field(field)
+        self._recording = None  # The moves that led to the saved state are not known.
+
+    def save_recording(self):
+        import tkinter.filedialog
+        import tkinter.messagebox
+        if self._recording is None:
+            tkinter.messagebox.showerror("Save recording", "A loaded game can not be recorded.", parent=self.root)
+            return
+        path = tkinter.filedialog.asksaveasfilename(parent=self.root, defaultextension=Recording.FILE_EXTENSION,
+                                                    filetypes=[("Recorded games", "*" + Recording.FILE_EXTENSION)])
+        if not path: return
+
+        self._recording.save(path)
+
+    def replay(self):
+        import tkinter.filedialog
+        import tkinter.messagebox
+        import tkinter.simpledialog
+        path = tkinter.filedialog.askopenfilename(parent=self.root,
+                                                  filetypes=[("Recorded games", "*" + Recording.FILE_EXTENSION)])
+        if not path: return
+        try:
+            recording = Recording.Recording.load(path)
+        except (ValueError, OSError) as error:
+            tkinter.messagebox.showerror("Replay", str(error), parent=self.root)
+            return
+        speed = tkinter.simpledialog.askfloat("Replay", "Moves per second:", initialvalue=5.0, minvalue=0.1,
+                                              maxvalue=1000.0, parent=self.root)
+        if speed is None: return
+
+        self.play_recording(recording, speed)
+
+    def play_recording(self, recording, moves_per_second=5.0):
+        """Shows the field of the recording and then its moves one by one. The player can not play until
+        the replay ends, a reset or a load stops it."""
+        self._pending_field = None
+        self._stop_progress()
+        self._show_field(recording.new_field(self._field_class))
+        self._replay = iter(recording.moves)
+        self._replay_step(self._replay, max(int(1000 / moves_per_second), 1))
+
+    def _replay_step(self, moves, interval):
+        if moves is not self._replay:
+            return  # Another field was shown in the meantime.
+        move = next(moves, None)
+        if move is None:
+            self._replay = None
+            return
+
+        self._apply_move(*move)
+        self.root.after(interval, self._replay_step, moves, interval)
 
     def reveal(self, event):
+        self._play(MineField.MOVE_REVEAL, event)
+
+    def chord(self, event):
+        """Middle click or double click on a revealed number with enough flags around it reveals the rest of its
+        neighbors."""
+        self._play(MineField.MOVE_CHORD, event)
+
+    def _play(self, kind, event):
+        """Applies one move of the given kind on the square under the mouse and redraws only what changed."""
+        if self._pending_field is not None or self._replay is not None: return
         if self.Field.boom or self.Field.check_win(): return
 
-        col = (event.x - 1) // self._row_size
-        row = (event.y - 1) // self._col_size
+        col, row = self._event_square(event)
+        if not (0 <= col < self._number_of_columns and 0 <= row < self._number_of_rows): return
 
-        if self.Field.field[col][row].is_flagged: return
+        self._apply_move(kind, col, row)
 
-        self.Field.reveal(col=col, row=row)
-        self.draw()
+    def _apply_move(self, kind, col, row):
+        changed = self.Field.apply_moves([(kind, col, row)])
+        if self._recording is not None:
+            self._recording.record(kind, col, row)
+        if self._solver is not None:
+            self._solver.update(changed)
+        self.draw(changed)
 
-    def toggle_flag(self, event):
+    def hint(self):
+        """Marks the square the solver recommends to reveal - green if it is certainly safe, orange if it is only
+        the square with the lowest probability of a mine. The mark disappears with the next move."""
+        if self._pending_field is not None or self._replay is not None: return
         if self.Field.boom or self.Field.check_win(): return
 
-        col = (event.x - 1) // self._row_size
-        row = (event.y - 1) // self._col_size
-
-        if self.Field.field[col][row].is_revealed: return
+        if self._solver is None:
+            import Solver
+            self._solver = Solver.Solver(self.Field)
+        square, probability = self._solver.hint()
+        if square is None: return
+        col, row = square
+
+        # Scroll the view so that the square is visible.
+        canvas = self._canvas_field
+        left, top = canvas.canvasx(0), canvas.canvasy(0)
+        x, y = col * self._row_size, row * self._col_size
+        if not left <= x <= left + self._width_of_view - self._row_size:
+            canvas.xview_moveto(max(x - self._width_of_view / 2, 0) / self._width_of_canvas)
+        if not top <= y <= top + self._height_of_view - self._col_size:
+            canvas.yview_moveto(max(y - self._height_of_view / 2, 0) / self._height_of_canvas)
+        self._update_view()
+
+        canvas.delete('hint')
+        canvas.create_rectangle(x + 2, y + 2, x + self._row_size, y + self._col_size, width=2, tags='hint',
+                                outline='green' if probability == 0 else 'orange')
+
+    def _event_square(self, event):
+        """Returns column and row of the square under the mouse event (event coordinates are relative to the
+        visible part of the canvas, so the scrolling has to be taken into account)."""
+        col = (int(self._canvas_field.canvasx(event.x)) - 1) // self._row_size
+        row = (int(self._canvas_field.canvasy(event.y)) - 1) // self._col_size
+        return col, row
 
-        self.Field.toggle_flag(col=col, row=row)
-        self.draw()
+    def toggle_flag(self, event):
+        self._play(MineField.MOVE_FLAG, event)
 
     def draw_info(self):
         self._canvas_info.delete('all')
+        self._draw_overlay()
+
         if self.Field.boom:
             self._canvas_info.create_text(80, 20, text="You lost!!", fill="black",
                                           font='Helvetica 14 bold')
@@ -173,74 +542,123 @@ class UI:
                                           font='Helvetica 14 bold')
             return
 
-        # self._canvas_info.create_text(80, 20, text="Mines to find: " + str(self.Field.number_of_mines), fill="black",
-        #                               font='Helvetica 14 bold')
+        # Mines minus flags, the fields count it without visiting the squares, so it is updated on every move.
+        self._canvas_info.create_text(80, 20, text=f"Mines to find: {self.Field.mines_left}", fill="black",
+                                      font='Helvetica 14 bold')
+
+    def _draw_overlay(self):
+        """Shows the measured values in a row under the board (the upper bar is too small for them) if the debug
+        overlay is on, otherwise hides the row."""
+        if not self._debug_overlay.get():
+            if self._overlay_label is not None:
+                self._overlay_label.grid_remove()
+            return
+        if self._overlay_label is None:
+            self._overlay_label = tkinter.Label(self.root, font='Helvetica 7', fg='gray25', justify='left',
+                                                anchor='w')
+            self._overlay_label.grid(column=0, row=3, columnspan=2, sticky='we')
+        self._overlay_label.config(text=Profiling.overlay_text())
+        self._overlay_label.grid()
 
     def _draw_grid(self):
         sizeX = self._width_of_canvas
         sizeY = self._height_of_canvas
         for i in range(self._number_of_rows + 1):
             self._canvas_field.create_line(0, i * self._col_size + 1, sizeX + 1, i * self._col_size + 1,
-                                           fill='#636363', width=1)
+                                           fill='#636363', width=1, tags='grid')
         for j in range(self._number_of_columns + 1):
             self._canvas_field.create_line(j * self._row_size + 1, 0, j * self._row_size + 1, sizeY + 1,
-                                           fill='#636363', width=1)
+                                           fill='#636363', width=1, tags='grid')
 
     def _draw_insides(self):
-        for row in range(self._number_of_rows):
-            for col in range(self._number_of_columns):
-
-                if not self.Field.field[col][row].is_revealed:
-                    self._canvas_field.create_image(col * self._row_size + 2, row * self._col_size + 2, anchor="nw",
-                                                    image=self.unrevealed_image)
-                color = 'white'  # Default color
-
-                # First squares are colored, then we write numbers.
-                if self.Field.field[col][row].is_flagged:
-                    self._canvas_field.create_image(col * self._row_size + 2, row * self._col_size + 2, anchor="nw",
-                                                    image=self.flagged_image)
-
-                if self.Field.field[col][row].is_revealed:
-                    color = '#A1A1A1'
-                    self._canvas_field.create_rectangle(col * self._row_size + 1, row * self._col_size + 1,
-                                                        col * self._row_size + self._row_size + 1,
-                                                        row * self._col_size + self._col_size + 1,
-                                                        outline=color, fill=color, width=1)
-                    if self.Field.field[col][row].is_mine:
-                        if not self.Field.boom:
-                            self._canvas_field.create_image(col * self._row_size + 2, row * self._col_size + 2,
-                                                            anchor="nw",
-                                                            image=self.mine_win_image)
-                        else:
-                            self._canvas_field.create_image(col * self._row_size + 2, row * self._col_size + 2,
-                                                            anchor="nw",
-                                                            image=self.mine_lose_image)
-                        continue
-
-                if self.Field.field[col][row].is_revealed:
-                    number = self.Field.field[col][row].number
-                    if number > 0:
-                        if number == 1:
-                            color = "black"
-                        elif number == 2:
-                            color = "blue"
-                        elif number == 3:
-                            color = "green"
-                        elif number > 3:
-                            color = "red"
-
-                        self._canvas_field.create_text(col * self._row_size + 14, row * self._col_size + 14,
-                                                       text=str(number), fill=color,
-                                                       font='Helvetica 12 bold')
-
-    def draw(self):
-        self._canvas_field.delete('all')
+        """Assigns canvas items to the squares in the view (plus margin). Items of squares that left the view are
+        hidden and reused for the squares that entered it, new items are created only if there are not enough
+        of them. Returns the squares that got new items, they still have to be drawn by '_draw_square'."""
+        canvas = self._canvas_field
+        view_left = int(canvas.canvasx(0))
+        view_top = int(canvas.canvasy(0))
+        col_from = max(view_left // self._row_size - self._view_margin, 0)
+        col_to = min((view_left + self._width_of_view) // self._row_size + 1 + self._view_margin,
+                     self._number_of_columns)
+        row_from = max(view_top // self._col_size - self._view_margin, 0)
+        row_to = min((view_top + self._height_of_view) // self._col_size + 1 + self._view_margin,
+                     self._number_of_rows)
+        if self._drawn_view == (col_from, col_to, row_from, row_to):
+            return []
+        self._drawn_view = (col_from, col_to, row_from, row_to)
+
+        for square in [square for square in self._square_items
+                       if not (col_from <= square[0] < col_to and row_from <= square[1] < row_to)]:
+            item = self._square_items.pop(square)
+            canvas.itemconfig(item, state='hidden')
+            self._free_items.append(item)
+
+        new_squares = [(col, row) for col in range(col_from, col_to) for row in range(row_from, row_to)
+                       if (col, row) not in self._square_items]
+        for col, row in new_squares:
+            if self._free_items:
+                item = self._free_items.pop()
+                canvas.coords(item, col * self._row_size + 2, row * self._col_size + 2)
+                canvas.itemconfig(item, state='normal')
+            else:
+                item = canvas.create_image(col * self._row_size + 2, row * self._col_size + 2, anchor="nw",
+                                           image=self.unrevealed_image)
+            self._square_items[(col, row)] = item
+
+        # Newly created items would cover the grid.
+        canvas.tag_raise('grid')
+        return new_squares
+
+    def _draw_square(self, col, row):
+        """Sets the image of the square's canvas item so that it shows the current state of the square."""
+        square = self.Field.field[col][row]
+        if not square.is_revealed:
+            image = self._tile('flagged') if square.is_flagged else self.unrevealed_image
+        elif square.is_mine:
+            image = self._tile('mine_lose' if self.Field.boom else 'mine_win')
+        else:
+            number = square.number
+            image = self._tile(number if number else 'revealed')
+        self._canvas_field.itemconfig(self._square_items[(col, row)], image=image)
+
+    def _update_view(self):
+        """Draws squares that came into the view after scrolling."""
+        for col, row in self._draw_insides():
+            self._draw_square(col, row)
+
+    def draw(self, changed=None):
+        """Redraws the squares that changed since the last call. Squares outside of the view are skipped, they are
+        drawn when they are scrolled into the view.
+        :param changed: Set of squares (tuples of column and row) to redraw, e.g. the set returned by
+        'Field.reveal'. If it is None, every square in the view is redrawn. (Default: None)"""
         self.draw_info()
-        self._draw_insides()
-        self._draw_grid()
+        self._canvas_field.delete('hint')
+        if self._drawn_field is not self.Field:
+            # New field - start with an empty canvas.
+            self._canvas_field.delete('all')
+            self._square_items = {}
+            self._free_items = []
+            self._drawn_view = None
+            self._drawn_field = self.Field
+            self._draw_grid()
+            changed = None
+
+        new_squares = self._draw_insides()
+        if changed is None:
+            changed = self._square_items
+        else:
+            changed = [square for square in changed if square in self._square_items]
+            changed.extend(new_squares)
+        for col, row in changed:
+            self._draw_square(col, row)
+        self._update_root()
+
+    def _update_root(self):
+        """Lets Tk process the changes of the canvas. It is a separate method so that its time can be measured."""
         self.root.update()
 
     def _ask_params(self):
+        import tkinter.ttk
         param_window = tkinter.Toplevel(self.root)
         param_window.title("Customize")
         param_window.iconphoto(False, self.logo)
@@ -0,0 +1,44 @@
+"""Compares construction time and memory of 'MineField.MineField' (list of 'Square' objects) and
+'ArrayMineField.ArrayMineField' (packed bytearray).
+
+Run from the root of the repository:
+    python benchmarks/bench_construction.py
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ArrayMineField
+import MineField
+
+SIZES = [(8, 8, 10), (100, 100, 1000), (300, 300, 9000), (999, 999, 99)]
+"""Columns, rows and mines of the measured boards. The last one is the biggest board the Customize window allows."""
+
+IMPLEMENTATIONS = [('MineField', MineField.MineField), ('ArrayMineField', ArrayMineField.ArrayMineField)]
+
+
+def measure(field_class, columns, rows, mines):
+    """Returns construction time in seconds and peak allocated memory in bytes of one board."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    field = field_class(columns, rows, mines)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del field
+    return elapsed, peak
+
+
+def main():
+    print(f"{'board':>16} {'implementation':>16} {'time [s]':>10} {'memory [MB]':>12}")
+    for columns, rows, mines in SIZES:
+        for name, field_class in IMPLEMENTATIONS:
+            elapsed, peak = measure(field_class, columns, rows, mines)
+            print(f"{f'{columns}x{rows}/{mines}':>16} {name:>16} {elapsed:>10.3f} {peak / 2 ** 20:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
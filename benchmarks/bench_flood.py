@@ -0,0 +1,44 @@
+"""Regression benchmark for the cost of one click that floods the whole board. Boards without mines are used,
+so a single 'reveal' has to open every square and the game is won right after it.
+
+Run from the root of the repository:
+    python benchmarks/bench_flood.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ArrayMineField
+import MineField
+
+SIZES = [(8, 8), (30, 30), (100, 100), (300, 300), (500, 500)]
+
+IMPLEMENTATIONS = [('MineField', MineField.MineField), ('ArrayMineField', ArrayMineField.ArrayMineField)]
+
+
+def measure(field_class, columns, rows):
+    """Returns the time in seconds of one flooding click followed by 'check_win'."""
+    field = field_class(columns, rows, 0)
+    start = time.perf_counter()
+    field.reveal(0, 0)
+    won = field.check_win()
+    elapsed = time.perf_counter() - start
+    assert won, 'The flood did not reveal the whole board.'
+    return elapsed
+
+
+def main():
+    print(f"{'board':>10} {'implementation':>16} {'time [s]':>10}")
+    for columns, rows in SIZES:
+        for name, field_class in IMPLEMENTATIONS:
+            try:
+                result = f'{measure(field_class, columns, rows):>10.3f}'
+            except RecursionError:
+                result = f"{'recursion':>10}"
+            print(f"{f'{columns}x{rows}':>10} {name:>16} {result}")
+
+
+if __name__ == '__main__':
+    main()
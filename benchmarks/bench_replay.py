@@ -0,0 +1,51 @@
+"""Regression benchmark for recording and headless replay. A game of 10000 moves is made up on a big board -
+flags on mines and reveals of safe squares in a random order - then it is encoded, decoded and replayed with both
+implementations of the field.
+
+Run from the root of the repository:
+    python benchmarks/bench_replay.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ArrayMineField
+import MineField
+import Recording
+
+COLUMNS, ROWS, MINES, MOVES = 200, 200, 8000, 10000
+
+IMPLEMENTATIONS = [('MineField', MineField.MineField), ('ArrayMineField', ArrayMineField.ArrayMineField)]
+
+
+def make_recording():
+    field = ArrayMineField.ArrayMineField(COLUMNS, ROWS, MINES, seed=1)
+    moves = [(MineField.MOVE_FLAG if field.field[col][row].is_mine else MineField.MOVE_REVEAL, col, row)
+             for col in range(COLUMNS) for row in range(ROWS)]
+    random.Random(1).shuffle(moves)
+    return Recording.Recording(COLUMNS, ROWS, MINES, field.seed, moves=moves[:MOVES])
+
+
+def main():
+    recording = make_recording()
+    start = time.perf_counter()
+    data = recording.to_bytes()
+    encoded = time.perf_counter()
+    Recording.Recording.from_bytes(data)
+    decoded = time.perf_counter()
+    print(f"{len(recording.moves)} moves, {len(data)} bytes")
+    print(f"encode {(encoded - start) * 1e3:.2f} ms, decode {(decoded - encoded) * 1e3:.2f} ms")
+
+    for name, field_class in IMPLEMENTATIONS:
+        start = time.perf_counter()
+        field = recording.replay(field_class)
+        elapsed = time.perf_counter() - start
+        assert not field.boom, 'The replay revealed a mine.'
+        print(f"replay {name:>16} {elapsed * 1e3:>8.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
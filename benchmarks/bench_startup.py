@@ -0,0 +1,80 @@
+"""Measures the startup of the game - time of importing 'main' (with the heaviest imported modules) and time from
+the start of the process to the first frame of the window. Every measurement runs in a fresh Python process.
+
+Time to the first frame needs a display, on a machine without one run it under a virtual X server from the root
+of the repository:
+    xvfb-run -a python benchmarks/bench_startup.py
+"""
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+RUNS = 7
+
+FIRST_FRAME = '''
+import ArrayMineField
+import UI_tkinter
+ui = UI_tkinter.UI(ArrayMineField.ArrayMineField(8, 8, 4))
+ui.root.update()
+print('first frame', flush=True)
+ui.root.destroy()
+'''
+"""Code of the measured process - the same as 'main.py' up to the first frame."""
+
+
+def import_times():
+    """Returns the median time of importing 'main' in seconds and the cumulative import times (in seconds)
+    of the modules of the slowest run, keyed by name."""
+    totals = []
+    modules = {}
+    for _ in range(RUNS):
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import main'], cwd=ROOT,
+                                capture_output=True, text=True, check=True)
+        run_modules = {}
+        for line in result.stderr.splitlines():
+            match = re.match(r'import time:\s+\d+ \|\s+(\d+) \|( *)(\S+)', line)
+            if match:
+                run_modules[match.group(3)] = int(match.group(1)) / 1e6
+        totals.append(run_modules['main'])
+        if run_modules['main'] >= max(totals):
+            modules = run_modules
+    return statistics.median(totals), modules
+
+
+def first_frame_time():
+    """Returns the median time from the start of the process to the first frame in seconds, or None if there is
+    no display."""
+    times = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        process = subprocess.Popen([sys.executable, '-c', FIRST_FRAME], cwd=ROOT, stdout=subprocess.PIPE,
+                                   stderr=subprocess.PIPE, text=True)
+        line = process.stdout.readline()
+        elapsed = time.perf_counter() - start
+        _, errors = process.communicate()
+        if line.strip() != 'first frame':
+            print(f"First frame not measured: {errors.strip().splitlines()[-1] if errors.strip() else 'no output'}")
+            return None
+        times.append(elapsed)
+    return statistics.median(times)
+
+
+def main():
+    total, modules = import_times()
+    print(f"import main: {total * 1e3:.1f} ms (median of {RUNS} runs)")
+    print("slowest imports of the slowest run:")
+    for name, cumulative in sorted(modules.items(), key=lambda item: -item[1])[1:11]:
+        print(f"{name:>30} {cumulative * 1e3:>8.1f} ms")
+
+    first_frame = first_frame_time()
+    if first_frame is not None:
+        print(f"process start to first frame: {first_frame * 1e3:.1f} ms (median of {RUNS} runs)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""Headless timing harness of 'UI_tkinter.UI' - measures how many clicks per second the UI handles on boards of
+several sizes. Clicks are simulated by calling the event handlers directly, every click includes the redraw and
+'root.update()', and the scrolling to the clicked square if it is outside of the view.
+
+It needs a display, on a machine without one run it under a virtual X server from the root of the repository:
+    xvfb-run -a python benchmarks/bench_ui.py
+"""
+import os
+import random
+import sys
+import time
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ArrayMineField
+import UI_tkinter
+
+SIZES = [(8, 8), (50, 50), (100, 100), (200, 200)]
+
+CLICKS = 200
+"""Number of simulated clicks per board."""
+
+
+def click_event(ui, col, row):
+    """Creates an object with the attributes of a Tk mouse event that hits the square (col, row). Coordinates of
+    events are relative to the view, so the view is scrolled first if the square is outside of it, as a player
+    would do."""
+    canvas = ui._canvas_field
+    x, y = col * ui._row_size, row * ui._col_size
+    left, top = canvas.canvasx(0), canvas.canvasy(0)
+    if not left <= x <= left + ui._width_of_view - ui._row_size:
+        canvas.xview_moveto(max(x - ui._width_of_view / 2, 0) / ui._width_of_canvas)
+    if not top <= y <= top + ui._height_of_view - ui._col_size:
+        canvas.yview_moveto(max(y - ui._height_of_view / 2, 0) / ui._height_of_canvas)
+    ui._update_view()
+    event = types.SimpleNamespace(x=x - int(canvas.canvasx(0)) + 2, y=y - int(canvas.canvasy(0)) + 2)
+    assert ui._event_square(event) == (col, row)
+    return event
+
+
+def measure(columns, rows):
+    """Returns time of the first draw in seconds and number of handled clicks per second. Half of the clicks toggle
+    flags, the other half reveals squares. Every fifth square is a mine, so floods stay small, and mines are never
+    clicked, so the game is not lost."""
+    rng = random.Random(0)
+    start = time.perf_counter()
+    ui = UI_tkinter.UI(ArrayMineField.ArrayMineField(columns, rows, columns * rows // 5, seed=0))
+    first_draw = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for click in range(CLICKS):
+        col, row = rng.randrange(columns), rng.randrange(rows)
+        while ui.Field.field[col][row].is_mine:
+            col, row = rng.randrange(columns), rng.randrange(rows)
+        if click % 2:
+            ui.toggle_flag(click_event(ui, col, row))
+        else:
+            ui.reveal(click_event(ui, col, row))
+    elapsed = time.perf_counter() - start
+
+    ui.root.destroy()
+    return first_draw, CLICKS / elapsed
+
+
+def main():
+    print(f"{'board':>10} {'first draw [s]':>15} {'clicks/s':>10}")
+    for columns, rows in SIZES:
+        first_draw, clicks_per_second = measure(columns, rows)
+        print(f"{f'{columns}x{rows}':>10} {first_draw:>15.3f} {clicks_per_second:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
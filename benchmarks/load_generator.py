@@ -0,0 +1,96 @@
+"""Load generator for the game server. Many clients play games at the same time, every client sends its moves
+in batches of random hidden squares until the game ends, then starts a new game. Prints moves per second and
+latency of the requests.
+
+Without '--port' or '--unix' an in-process server on a free port of localhost is started, so run it simply from
+the root of the repository:
+    python benchmarks/load_generator.py --clients 50 --seconds 5
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import MineField
+import Server
+
+
+async def play(client, arguments, seed, deadline, latencies):
+    """Plays games until the deadline, returns the number of moves and games played."""
+    rng = random.Random(seed)
+    moves = games = 0
+    while time.perf_counter() < deadline:
+        game = await client.new(arguments.columns, arguments.rows, arguments.mines, seed=rng.getrandbits(32),
+                                first_click=MineField.FIRST_CLICK_SAFE)
+        hidden = [[col, row] for col in range(arguments.columns) for row in range(arguments.rows)]
+        rng.shuffle(hidden)
+        hidden_set = {tuple(square) for square in hidden}
+        while hidden and time.perf_counter() < deadline:
+            batch = []
+            while hidden and len(batch) < arguments.batch:
+                square = hidden.pop()
+                if tuple(square) in hidden_set:
+                    batch.append(square)
+            start = time.perf_counter()
+            answer = await client.reveal(game['session'], batch)
+            latencies.append(time.perf_counter() - start)
+            moves += len(batch)
+            hidden_set.difference_update((col, row) for col, row, _ in answer['changed'])
+            if answer['boom'] or answer['won']:
+                break
+        await client.end(game['session'])
+        games += 1
+    return moves, games
+
+
+async def run(arguments):
+    server = None
+    host, port, unix_path = arguments.host, arguments.port, arguments.unix
+    if port is None and unix_path is None:
+        server = Server.GameServer()
+        host, port = (await server.start(host, 0))[:2]
+
+    clients = [await Server.Client.connect(host, port, unix_path) for _ in range(arguments.clients)]
+    latencies = []
+    start = time.perf_counter()
+    deadline = start + arguments.seconds
+    results = await asyncio.gather(*(play(client, arguments, seed, deadline, latencies)
+                                     for seed, client in enumerate(clients)))
+    elapsed = time.perf_counter() - start
+    for client in clients:
+        await client.close()
+    if server is not None:
+        await server.close()
+
+    moves = sum(result[0] for result in results)
+    games = sum(result[1] for result in results)
+    latencies.sort()
+    print(f"{arguments.clients} clients, {games} games, {len(latencies)} requests, {moves} moves in {elapsed:.2f} s")
+    print(f"{moves / elapsed:.0f} moves/s, {len(latencies) / elapsed:.0f} requests/s, {games / elapsed:.1f} games/s")
+    if latencies:
+        print(f"latency [ms]: median {statistics.median(latencies) * 1e3:.2f}, "
+              f"p99 {latencies[int(len(latencies) * 0.99)] * 1e3:.2f}, max {latencies[-1] * 1e3:.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generates load for the game server.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=None, help='port of a running server')
+    parser.add_argument('--unix', default=None, help='Unix socket of a running server')
+    parser.add_argument('--clients', type=int, default=20)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--columns', type=int, default=16)
+    parser.add_argument('--rows', type=int, default=16)
+    parser.add_argument('--mines', type=int, default=40)
+    parser.add_argument('--batch', type=int, default=4, help='number of reveals sent in one request')
+    asyncio.run(run(parser.parse_args(argv)))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
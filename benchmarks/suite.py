@@ -0,0 +1,305 @@
+"""Benchmark suite of the engine and the renderer. Results are saved as JSON into 'benchmarks/results', one file
+per commit, and compared with the results of another commit (by default the nearest ancestor with saved results),
+so that regressions show up. Results are comparable only if they were measured on the same machine.
+
+Measured are construction of both field implementations, '_generate_mines' at several densities, the worst case
+flood of 'reveal' (a board without mines), 'check_win', 'reveal_all' and drawing of the UI - '_draw_grid' and
+'_draw_insides'. The UI needs a display, on a machine without one run it under a virtual X server, otherwise
+the UI benchmarks are skipped.
+
+Run from the root of the repository:
+    xvfb-run -a python benchmarks/suite.py                  # measure and save the results of HEAD
+    python benchmarks/suite.py --quick --filter ArrayMineField
+    python benchmarks/suite.py --compare 1a2b3c4            # compare with the results of another commit
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import ArrayMineField
+import MineField
+
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+
+SIZES = [(8, 8), (30, 16), (100, 100), (300, 300), (999, 999)]
+"""Columns and rows of the measured boards, from the smallest one to the biggest one the Customize window allows."""
+
+DENSITIES = [0.01, 0.15, 0.5, 0.9]
+"""Densities of mines for '_generate_mines'."""
+
+DENSITY = 0.15
+"""Density of mines of the other benchmarks."""
+
+IMPLEMENTATIONS = [('MineField', MineField.MineField), ('ArrayMineField', ArrayMineField.ArrayMineField)]
+
+REPEAT = 5
+BUDGET = 1.0
+"""Every benchmark runs REPEAT times, or fewer times (at least once) if it takes longer than BUDGET seconds."""
+
+
+class Benchmark:
+    """One measured case. 'setup' prepares the state and returns the measured function without arguments.
+    If the function changes the state (e.g. a reveal), 'setup' is called before every run, otherwise the function
+    runs in a loop long enough to be measured precisely and the time of one call is reported."""
+
+    def __init__(self, name, setup, mutates=True):
+        self.name = name
+        self.setup = setup
+        self.mutates = mutates
+
+    def run(self):
+        """Returns the times of one call in seconds."""
+        times = []
+        deadline = time.perf_counter() + BUDGET
+        if self.mutates:
+            for _ in range(REPEAT):
+                function = self.setup()
+                start = time.perf_counter()
+                function()
+                times.append(time.perf_counter() - start)
+                if time.perf_counter() > deadline:
+                    break
+        else:
+            timer = timeit.Timer(self.setup())
+            number, _ = timer.autorange()
+            for _ in range(REPEAT):
+                times.append(timer.timeit(number) / number)
+                if time.perf_counter() > deadline:
+                    break
+        return times
+
+
+def _mines(columns, rows, density):
+    return int(columns * rows * density)
+
+
+def engine_benchmarks(sizes):
+    benchmarks = []
+    for name, field_class in IMPLEMENTATIONS:
+        for columns, rows in sizes:
+            board = f'{columns}x{rows}'
+            mines = _mines(columns, rows, DENSITY)
+
+            def construct_setup(field_class=field_class, columns=columns, rows=rows, mines=mines):
+                return lambda: field_class(columns, rows, mines, seed=0)
+
+            def flood_setup(field_class=field_class, columns=columns, rows=rows):
+                # Worst case - there are no mines, so one click reveals the whole board.
+                field = field_class(columns, rows, 0)
+                return lambda: field.reveal(0, 0)
+
+            def check_win_setup(field_class=field_class, columns=columns, rows=rows, mines=mines):
+                # A game in progress - the first click opened an area, but the game is not won.
+                field = field_class(columns, rows, mines, seed=0, first_click=MineField.FIRST_CLICK_ZERO)
+                field.reveal(columns // 2, rows // 2)
+                return field.check_win
+
+            def reveal_all_setup(field_class=field_class, columns=columns, rows=rows, mines=mines):
+                return field_class(columns, rows, mines, seed=0).reveal_all
+
+            benchmarks.append(Benchmark(f'{name}.construct[{board}]', construct_setup, mutates=False))
+            for density in DENSITIES:
+                def generate_mines_setup(field_class=field_class, columns=columns, rows=rows, density=density):
+                    # Fields with 'first_click' do not generate mines in the constructor.
+                    return field_class(columns, rows, _mines(columns, rows, density), seed=0,
+                                       first_click=MineField.FIRST_CLICK_SAFE)._generate_mines
+
+                benchmarks.append(Benchmark(f'{name}._generate_mines[{board},{density}]', generate_mines_setup,
+                                            mutates=False))
+            benchmarks.append(Benchmark(f'{name}.reveal_flood[{board}]', flood_setup))
+            benchmarks.append(Benchmark(f'{name}.check_win[{board}]', check_win_setup, mutates=False))
+            benchmarks.append(Benchmark(f'{name}.reveal_all[{board}]', reveal_all_setup))
+    return benchmarks
+
+
+def ui_benchmarks(sizes):
+    """Benchmarks of the renderer, an empty list if the UI can not be started (no display)."""
+    try:
+        import tkinter
+        import UI_tkinter
+    except ImportError as error:
+        print(f"UI benchmarks skipped: {error}", file=sys.stderr)
+        return []
+    try:
+        tkinter.Tk().destroy()
+    except tkinter.TclError as error:
+        print(f"UI benchmarks skipped, run the suite under xvfb-run: {error}", file=sys.stderr)
+        return []
+
+    uis = {}
+
+    def get_ui(columns, rows):
+        """One window per size, kept open for all the benchmarks of the size."""
+        if (columns, rows) not in uis:
+            for ui in uis.values():
+                ui.root.destroy()
+            uis.clear()
+            uis[(columns, rows)] = UI_tkinter.UI(
+                ArrayMineField.ArrayMineField(columns, rows, _mines(columns, rows, DENSITY), seed=0))
+        return uis[(columns, rows)]
+
+    def draw_grid_setup(columns, rows):
+        ui = get_ui(columns, rows)
+        ui._canvas_field.delete('grid')
+        ui._update_root()
+
+        def draw_grid():
+            ui._draw_grid()
+            ui._update_root()
+        return draw_grid
+
+    def draw_insides_setup(columns, rows):
+        # Start with no items, as when a new field is shown.
+        ui = get_ui(columns, rows)
+        for item in ui._square_items.values():
+            ui._canvas_field.delete(item)
+        for item in ui._free_items:
+            ui._canvas_field.delete(item)
+        ui._square_items, ui._free_items, ui._drawn_view = {}, [], None
+        ui._update_root()
+
+        def draw_insides():
+            ui._update_view()
+            ui._update_root()
+        return draw_insides
+
+    def scroll_setup(columns, rows):
+        # Scrolling by a whole view - every item is reused for a square that entered the view.
+        ui = get_ui(columns, rows)
+        ui._canvas_field.xview_moveto(0)
+        ui._update_view()
+        ui._update_root()
+
+        def scroll():
+            ui._canvas_field.xview_scroll(ui._width_of_view // ui._col_size, 'units')
+            ui._update_view()
+            ui._update_root()
+        return scroll
+
+    benchmarks = []
+    for columns, rows in sizes:
+        board = f'{columns}x{rows}'
+        benchmarks.append(Benchmark(f'UI._draw_grid[{board}]',
+                                    lambda columns=columns, rows=rows: draw_grid_setup(columns, rows)))
+        benchmarks.append(Benchmark(f'UI._draw_insides[{board}]',
+                                    lambda columns=columns, rows=rows: draw_insides_setup(columns, rows)))
+        if columns * UI_tkinter.UI._col_size > 2 * UI_tkinter.UI._max_view_width:
+            benchmarks.append(Benchmark(f'UI._draw_insides_scroll[{board}]',
+                                        lambda columns=columns, rows=rows: scroll_setup(columns, rows)))
+    return benchmarks
+
+
+def _git(*args):
+    try:
+        return subprocess.run(['git', *args], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def current_commit():
+    """Returns the short hash of HEAD, with '-dirty' if tracked files are modified."""
+    commit = _git('rev-parse', '--short', 'HEAD') or 'unknown'
+    if _git('status', '--porcelain', '--untracked-files=no'):
+        commit += '-dirty'
+    return commit
+
+
+def load_results(commit):
+    """Returns the saved results of the commit (full or short hash)."""
+    short = _git('rev-parse', '--short', commit) or commit
+    for name in (commit, short):
+        path = os.path.join(RESULTS_DIR, f'{name}.json')
+        if os.path.exists(path):
+            with open(path) as file:
+                return json.load(file)
+    raise FileNotFoundError(f"No saved results of {commit} in {RESULTS_DIR}.")
+
+
+def previous_results(commit):
+    """Returns the saved results of the nearest ancestor of 'commit' that has them, or None. The results of a dirty
+    tree are compared with those of its clean commit, if there are some."""
+    first = commit.removesuffix('-dirty') if commit.endswith('-dirty') else f'{commit}~1'
+    for ancestor in _git('rev-list', '--abbrev-commit', '--max-count=200', first).split():
+        try:
+            return load_results(ancestor)
+        except FileNotFoundError:
+            continue
+    return None
+
+
+def compare(results, baseline, threshold):
+    """Prints the ratio of the minimal times of the benchmarks measured in both (the minimum is the least affected
+    by the noise of other processes) and returns the names of those that are slower by more than 'threshold'
+    (e.g. 0.1 for 10 %)."""
+    print(f"\nCompared with {baseline['commit']}:")
+    regressions = []
+    for name, result in results['benchmarks'].items():
+        if name not in baseline['benchmarks'] or not baseline['benchmarks'][name]['min']:
+            continue
+        ratio = result['min'] / baseline['benchmarks'][name]['min']
+        mark = ''
+        if ratio > 1 + threshold:
+            mark = '  REGRESSION'
+            regressions.append(name)
+        elif ratio < 1 / (1 + threshold):
+            mark = '  faster'
+        print(f"{name:<52} {ratio:>7.2f}x{mark}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark suite of the engine and the renderer.')
+    parser.add_argument('--quick', action='store_true', help='skip the biggest board')
+    parser.add_argument('--filter', default='', help='run only benchmarks whose name contains this text')
+    parser.add_argument('--no-ui', action='store_true', help='skip the benchmarks of the UI')
+    parser.add_argument('--compare', metavar='COMMIT', default=None,
+                        help='compare with the saved results of COMMIT (default: the nearest saved ancestor)')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='slowdown reported as a regression (default: 0.1 - 10 %%)')
+    parser.add_argument('--no-save', action='store_true', help='do not save the results')
+    parser.add_argument('--fail-on-regression', action='store_true', help='exit with 1 if there is a regression')
+    arguments = parser.parse_args(argv)
+
+    sizes = SIZES[:-1] if arguments.quick else SIZES
+    benchmarks = engine_benchmarks(sizes)
+    if not arguments.no_ui:
+        benchmarks += ui_benchmarks(sizes)
+    benchmarks = [benchmark for benchmark in benchmarks if arguments.filter in benchmark.name]
+
+    commit = current_commit()
+    results = {'commit': commit, 'date': datetime.datetime.now().isoformat(timespec='seconds'),
+               'python': platform.python_version(), 'platform': platform.platform(), 'benchmarks': {}}
+    print(f"{'benchmark':<52} {'median [us]':>14} {'min [us]':>14} {'runs':>5}")
+    for benchmark in benchmarks:
+        times = benchmark.run()
+        result = {'median': statistics.median(times), 'min': min(times), 'runs': len(times)}
+        results['benchmarks'][benchmark.name] = result
+        print(f"{benchmark.name:<52} {result['median'] * 1e6:>14.2f} {result['min'] * 1e6:>14.2f} "
+              f"{result['runs']:>5}")
+
+    if not arguments.no_save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, f'{commit}.json')
+        with open(path, 'w') as file:
+            json.dump(results, file, indent=1)
+        print(f"\nSaved to {os.path.relpath(path, ROOT)}")
+
+    baseline = load_results(arguments.compare) if arguments.compare else previous_results(commit)
+    regressions = compare(results, baseline, arguments.threshold) if baseline is not None else []
+    if arguments.fail_on_regression and regressions:
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
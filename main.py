@@ -1,12 +1,37 @@
-import MineField
+import argparse
+
+import ArrayMineField
+import Profiling
 import UI_tkinter
 
 
-def main() -> int:
-    Field = MineField.MineField(8, 8, 4)
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Minesweeper')
+    parser.add_argument('--instrument', action='store_true',
+                        help='measure reveals and drawing, show the values in the upper bar and print them at exit')
+    parser.add_argument('--profile', metavar='PATH', default=None,
+                        help='profile the whole session with cProfile and dump the statistics to PATH')
+    arguments = parser.parse_args(argv)
+
+    if arguments.profile:
+        Profiling.start_cprofile()
+    if arguments.instrument:
+        Profiling.enable()
+
+    Field = ArrayMineField.ArrayMineField(8, 8, 4)
     UI = UI_tkinter.UI(Field)
     UI.root.mainloop()
+    UI.close()
+
+    if arguments.instrument:
+        for name, summary in Profiling.stats().items():
+            print(name, summary)
+    if arguments.profile:
+        Profiling.stop_cprofile(arguments.profile)
+    return 0
 
 
 if __name__ == '__main__':
+    import multiprocessing
+    multiprocessing.freeze_support()  # Worker processes of 'NoGuess' in the bundled executable.
     main()
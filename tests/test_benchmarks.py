@@ -0,0 +1,17 @@
+"""Checks of the choice of the baseline of the benchmark suite."""
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+
+import suite
+
+
+def test_dirty_tree_is_compared_with_its_commit(tmp_path, monkeypatch):
+    monkeypatch.setattr(suite, 'RESULTS_DIR', str(tmp_path))
+    head = suite._git('rev-parse', '--short', 'HEAD')
+    (tmp_path / f'{head}.json').write_text(json.dumps({'commit': head, 'benchmarks': {}}))
+    assert suite.previous_results(f'{head}-dirty')['commit'] == head
+    # A clean commit is never compared with itself.
+    assert suite.previous_results(head) is None
@@ -0,0 +1,180 @@
+"""Checks of the engines, the solver and the binary formats. Run from the root of the repository with:
+    python -m pytest tests
+"""
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ArrayMineField
+import MineField
+import Recording
+import Serialization
+import Solver
+
+MOVES = (MineField.MOVE_REVEAL, MineField.MOVE_FLAG, MineField.MOVE_CHORD)
+FIRST_CLICKS = (None, MineField.FIRST_CLICK_SAFE, MineField.FIRST_CLICK_ZERO)
+
+
+def random_moves(rng, columns, rows, count):
+    return [(rng.choice(MOVES), rng.randrange(columns), rng.randrange(rows)) for _ in range(count)]
+
+
+def state(field):
+    """Returns the visible state of every square and of the game."""
+    columns, rows = field.get_dimensions()
+    squares = []
+    for col in range(columns):
+        for row in range(rows):
+            square = field.field[col][row]
+            squares.append((square.is_mine, square.is_revealed, square.is_flagged,
+                            square.number if square.is_revealed and not square.is_mine else None))
+    return squares, field.boom, field.mines_left
+
+
+@pytest.mark.parametrize('first_click', FIRST_CLICKS)
+@pytest.mark.parametrize('seed', range(20))
+def test_engines_behave_the_same(seed, first_click):
+    rng = random.Random(seed)
+    columns, rows = rng.randint(1, 16), rng.randint(1, 16)
+    mines = rng.randint(0, columns * rows - 1) // 3
+    fields = [MineField.MineField(columns, rows, mines, seed=seed, first_click=first_click),
+              ArrayMineField.ArrayMineField(columns, rows, mines, seed=seed, first_click=first_click)]
+    for moves in [random_moves(rng, columns, rows, rng.randint(1, 5)) for _ in range(10)]:
+        changed = [field.apply_moves(moves) for field in fields]
+        assert changed[0] == changed[1]
+        assert state(fields[0]) == state(fields[1])
+        assert fields[0].check_win() == fields[1].check_win()
+
+
+@pytest.mark.parametrize('field_class', [MineField.MineField, ArrayMineField.ArrayMineField])
+def test_numbers_read_before_the_first_click(field_class):
+    field = field_class(5, 5, 10, seed=3, first_click=MineField.FIRST_CLICK_SAFE)
+    for col in range(5):
+        for row in range(5):
+            field.field[col][row].number
+    field.reveal(2, 2)
+    assert not field.field[2][2].is_mine
+    assert field.field[2][2].number == sum(field.field[col][row].is_mine for col in range(1, 4)
+                                           for row in range(1, 4))
+    assert not field.check_win()
+
+
+def test_statistics():
+    rng = random.Random(1)
+    field = ArrayMineField.ArrayMineField(20, 15, 40, seed=1)
+    field.apply_moves(random_moves(rng, 20, 15, 60))
+    squares, _, _ = state(field)
+    mines = [square[0] for square in squares]
+    flags = [square[2] for square in squares]
+    statistics = field.statistics()
+    assert statistics['mines'] == sum(mines) == 40
+    assert statistics['revealed'] == sum(square[1] for square in squares)
+    assert statistics['flagged'] == sum(flags)
+    assert statistics['flagged_correctly'] == sum(mine and flag for mine, flag in zip(mines, flags))
+    assert statistics['mines_left'] == field.mines_left == 40 - sum(flags)
+
+
+@pytest.mark.parametrize('field_class', [MineField.MineField, ArrayMineField.ArrayMineField])
+@pytest.mark.parametrize('seed', range(5))
+def test_save_and_load(tmp_path, field_class, seed):
+    rng = random.Random(seed)
+    field = field_class(30, 16, 99, seed=seed, first_click=MineField.FIRST_CLICK_SAFE)
+    path = tmp_path / f'game{Serialization.FILE_EXTENSION}'
+
+    field_classes = (MineField.MineField, ArrayMineField.ArrayMineField)
+    Serialization.save(field, path)
+    for loaded_class in field_classes:
+        loaded = Serialization.load(path, loaded_class)
+        assert not loaded.mines_placed and loaded.first_click == MineField.FIRST_CLICK_SAFE
+
+    field.apply_moves(random_moves(rng, 30, 16, 30))
+    Serialization.save(field, path)
+    loaded_fields = [Serialization.load(path, loaded_class) for loaded_class in field_classes]
+    for loaded_class, loaded in zip(field_classes, loaded_fields):
+        assert type(loaded) is loaded_class
+        assert state(loaded) == state(field)
+        assert loaded.seed == field.seed
+        assert loaded.check_win() == field.check_win()
+
+    # The loaded games continue the same way as the saved one.
+    moves = random_moves(rng, 30, 16, 30)
+    assert [loaded.apply_moves(moves) for loaded in loaded_fields] == [field.apply_moves(moves)] * 2
+    assert [state(loaded) for loaded in loaded_fields] == [state(field)] * 2
+
+
+def test_load_rejects_other_files(tmp_path):
+    path = tmp_path / 'bad.mines'
+    path.write_bytes(b'not a saved game')
+    with pytest.raises(ValueError):
+        Serialization.load(path)
+
+
+@pytest.mark.parametrize('first_click', FIRST_CLICKS)
+def test_recording_round_trip(tmp_path, first_click):
+    rng = random.Random(2)
+    field = ArrayMineField.ArrayMineField(30, 16, 60, seed=7, first_click=first_click)
+    recording = Recording.Recording.from_field(field)
+    for kind, col, row in random_moves(rng, 30, 16, 50):
+        field.apply_moves([(kind, col, row)])
+        recording.record(kind, col, row)
+
+    path = tmp_path / f'game{Recording.FILE_EXTENSION}'
+    recording.save(path)
+    loaded = Recording.Recording.load(path)
+    assert loaded.moves == recording.moves
+    for field_class in (MineField.MineField, ArrayMineField.ArrayMineField):
+        assert state(loaded.replay(field_class)) == state(field)
+
+
+def test_recording_rejects_unknown_moves():
+    data = Recording.Recording(5, 5, 3, 1, moves=[(MineField.MOVE_REVEAL, 1, 1)]).to_bytes()
+    with pytest.raises(ValueError):
+        Recording.Recording.from_bytes(data[:-1] + bytes([data[-1] | 3]))
+
+
+@pytest.mark.parametrize('seed', range(30))
+def test_solver_never_marks_a_mine_as_safe(seed):
+    field = ArrayMineField.ArrayMineField(16, 16, 40, seed=seed, first_click=MineField.FIRST_CLICK_ZERO)
+    solver = Solver.Solver(field)
+    solver.update(field.reveal(8, 8))
+    while not field.boom and not field.check_win():
+        safe, mines = solver.solve()
+        assert not any(field.field[col][row].is_mine for col, row in safe)
+        assert all(field.field[col][row].is_mine for col, row in mines)
+        if not safe:
+            break
+        solver.update(field.reveal_many(safe))
+    assert not field.boom
+
+
+@pytest.mark.parametrize('field_class', [MineField.MineField, ArrayMineField.ArrayMineField])
+@pytest.mark.parametrize('mines, first_click', [(2, 'bogus'), (9, MineField.FIRST_CLICK_SAFE),
+                                                (9, MineField.FIRST_CLICK_ZERO), (10, None), (-1, None)])
+def test_invalid_parameters_fail_in_the_constructor(field_class, mines, first_click):
+    with pytest.raises(ValueError):
+        field_class(3, 3, mines, first_click=first_click)
+
+
+def test_engines_agree_before_the_first_click():
+    fields = [field_class(3, 3, 8, seed=1, first_click=MineField.FIRST_CLICK_SAFE)
+              for field_class in (MineField.MineField, ArrayMineField.ArrayMineField)]
+    assert [field.check_win() for field in fields] == [False, False]
+    assert [field.reveal_all(only_mines=True) for field in fields] == [set(), set()]
+    assert fields[0].reveal_all() == fields[1].reveal_all()
+    assert state(fields[0]) == state(fields[1])
+
+
+@pytest.mark.parametrize('field_class', [MineField.MineField, ArrayMineField.ArrayMineField])
+def test_flag_moves_go_through_toggle_flag(monkeypatch, field_class):
+    toggled = []
+    toggle_flag = field_class.toggle_flag
+    monkeypatch.setattr(field_class, 'toggle_flag', lambda self, col, row: toggled.append((col, row))
+                        or toggle_flag(self, col, row))
+    field = field_class(5, 5, 3, seed=1)
+    field.apply_moves([(MineField.MOVE_FLAG, 1, 1), (MineField.MOVE_FLAG, 2, 2), (MineField.MOVE_FLAG, 1, 1)])
+    assert toggled == [(1, 1), (2, 2), (1, 1)]
+    assert field.mines_left == 2 and field.field[2][2].is_flagged and not field.field[1][1].is_flagged
@@ -0,0 +1,43 @@
+"""Checks of the index of neighbors against a direct computation, including the squares at the border."""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ArrayMineField
+import NeighborIndex
+
+
+def expected_neighbors(number_of_columns, number_of_rows, col, row):
+    return sorted((col + dc) * number_of_rows + row + dr for dc in (-1, 0, 1) for dr in (-1, 0, 1)
+                  if (dc or dr) and 0 <= col + dc < number_of_columns and 0 <= row + dr < number_of_rows)
+
+
+@pytest.mark.parametrize('number_of_columns, number_of_rows', [(1, 1), (1, 5), (5, 1), (2, 2), (3, 7), (16, 30)])
+def test_index_matches_the_neighbors(number_of_columns, number_of_rows):
+    index = NeighborIndex.neighbor_index(number_of_columns, number_of_rows)
+    sentinel = number_of_columns * number_of_rows
+    assert len(index) == NeighborIndex.NEIGHBORS * sentinel
+    for col in range(number_of_columns):
+        for row in range(number_of_rows):
+            i = col * number_of_rows + row
+            slots = index[NeighborIndex.NEIGHBORS * i:NeighborIndex.NEIGHBORS * (i + 1)]
+            expected = expected_neighbors(number_of_columns, number_of_rows, col, row)
+            assert sorted(neighbor for neighbor in slots if neighbor != sentinel) == expected
+            # Every missing neighbor points to the sentinel, none is outside of the array of squares.
+            assert list(slots).count(sentinel) == NeighborIndex.NEIGHBORS - len(expected)
+
+
+def test_index_is_shared_by_fields_of_the_same_shape():
+    assert NeighborIndex.neighbor_index(4, 6) is NeighborIndex.neighbor_index(4, 6)
+    assert NeighborIndex.neighbor_index(4, 6) is not NeighborIndex.neighbor_index(6, 4)
+
+
+@pytest.mark.parametrize('number_of_columns, number_of_rows', [(1, 1), (1, 6), (6, 1), (4, 5)])
+def test_flood_stops_at_the_border(number_of_columns, number_of_rows):
+    field = ArrayMineField.ArrayMineField(number_of_columns, number_of_rows, 0, seed=0)
+    squares = {(col, row) for col in range(number_of_columns) for row in range(number_of_rows)}
+    assert field.reveal(number_of_columns - 1, number_of_rows - 1) == squares
+    assert field.check_win() and not field.boom
@@ -0,0 +1,68 @@
+"""Checks of the generation of boards that can be solved without guessing. The searches use processes spawned from
+this module, so they are done with one worker and small boards to keep the tests fast."""
+import concurrent.futures
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import NoGuess
+
+
+@pytest.fixture(scope='module')
+def searcher():
+    with NoGuess.Searcher(workers=1) as searcher:
+        yield searcher
+
+
+def test_generated_board_is_no_guess(searcher):
+    field = searcher.generate(9, 9, 10, seed=1)
+    assert NoGuess.is_no_guess(9, 9, 10, field.seed)
+    assert field.field[4][4].is_revealed and field.field[4][4].number == 0
+    replayed = NoGuess.recording(field).replay()
+    assert [[square.is_mine for square in column] for column in replayed.field] == \
+           [[square.is_mine for square in column] for column in field.field]
+
+
+def test_cancel_stops_the_search_and_keeps_the_searcher_usable(searcher, monkeypatch):
+    # An impossible density, so the search runs until it is cancelled.
+    monkeypatch.setattr(NoGuess, 'MAX_CANDIDATES', 10 ** 9)
+    timer = threading.Timer(0.3, searcher.cancel)
+    timer.start()
+    start = time.perf_counter()
+    with pytest.raises(concurrent.futures.CancelledError):
+        searcher.find_seed(8, 8, 40)
+    assert time.perf_counter() - start < 10
+    timer.join()
+    monkeypatch.undo()
+    assert NoGuess.is_no_guess(9, 9, 10, searcher.find_seed(9, 9, 10, seed=1))
+
+
+def test_too_many_mines_are_rejected(searcher):
+    with pytest.raises(ValueError):
+        searcher.find_seed(3, 3, 9)
+
+
+def test_pool_boards_are_taken_once(tmp_path, searcher):
+    pool = NoGuess.BoardPool(str(tmp_path))
+    assert pool.take(9, 9, 10) is None
+    pool.fill(9, 9, 10, 2, searcher=searcher)
+    assert pool.count(9, 9, 10) == 2
+    seeds = {pool.take(9, 9, 10).seed, pool.take(9, 9, 10).seed}
+    assert len(seeds) == 2 and all(NoGuess.is_no_guess(9, 9, 10, seed) for seed in seeds)
+    assert pool.take(9, 9, 10) is None
+    assert os.listdir(tmp_path / '9x9x10') == []
+
+
+def test_damaged_board_is_dropped(tmp_path, searcher):
+    pool = NoGuess.BoardPool(str(tmp_path))
+    seed = searcher.find_seed(9, 9, 10, seed=1)
+    pool.add(NoGuess.candidate(9, 9, 10, seed))
+    (tmp_path / '9x9x10' / f'0{NoGuess.Serialization.FILE_EXTENSION}').write_bytes(b'damaged')
+    field = pool.take(9, 9, 10)
+    assert field.seed == seed
+    assert pool.count(9, 9, 10) == 0
@@ -0,0 +1,59 @@
+"""Checks of the opt-in instrumentation."""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ArrayMineField
+import MineField
+import Profiling
+
+
+@pytest.fixture
+def profiling():
+    Profiling.reset()
+    yield Profiling
+    Profiling.disable()
+    Profiling.reset()
+
+
+def methods():
+    return {(cls, name): cls.__dict__[name] for cls in (MineField.MineField, ArrayMineField.ArrayMineField)
+            for name in ('_reveal', 'check_win', 'apply_moves')}
+
+
+def test_disable_restores_the_original_methods(profiling):
+    originals = methods()
+    profiling.enable()
+    profiling.enable()
+    assert profiling.is_enabled()
+    assert all(methods()[key] is not original for key, original in originals.items())
+    profiling.disable()
+    assert not profiling.is_enabled()
+    assert methods() == originals
+
+
+@pytest.mark.parametrize('field_class', [MineField.MineField, ArrayMineField.ArrayMineField])
+def test_calls_are_recorded_only_while_enabled(profiling, field_class):
+    field = field_class(9, 9, 10, seed=1)
+    profiling.enable()
+    field.apply_moves([(MineField.MOVE_REVEAL, 0, 0), (MineField.MOVE_FLAG, 8, 8)])
+    field.check_win()
+    profiling.disable()
+    field.check_win()
+    stats = profiling.stats()
+    assert stats['apply_moves']['count'] == 1 and stats['check_win']['count'] == 1
+    assert stats['_reveal']['count'] >= 1
+
+
+@pytest.mark.parametrize('field_class', [MineField.MineField, ArrayMineField.ArrayMineField])
+def test_flood_sizes_add_up_to_the_revealed_squares(profiling, field_class):
+    field = field_class(16, 16, 40, seed=2, first_click=MineField.FIRST_CLICK_ZERO)
+    profiling.enable()
+    revealed = field.reveal(8, 8)
+    profiling.disable()
+    flood_size = profiling.stats()['flood_size']
+    assert flood_size['count'] == profiling.stats()['_reveal']['count'] == 1
+    assert flood_size['last'] == len(revealed) > 1
@@ -0,0 +1,119 @@
+"""Checks of the game server, over a TCP connection to localhost and through 'GameServer.handle'."""
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ArrayMineField
+import Server
+
+
+def run(coroutine_function):
+    """Runs the coroutine function with a started server and a connected client."""
+    async def main():
+        server = Server.GameServer()
+        host, port = (await server.start('127.0.0.1', 0))[:2]
+        client = await Server.Client.connect(host, port)
+        try:
+            return await coroutine_function(server, client, host, port)
+        finally:
+            await client.close()
+            await server.close()
+
+    return asyncio.run(main())
+
+
+def test_game_over_localhost():
+    async def play(server, client, host, port):
+        game = await client.new(9, 9, 10, seed=5, first_click='zero')
+        field = ArrayMineField.ArrayMineField(9, 9, 10, seed=5, first_click='zero')
+        answer = await client.reveal(game['session'], [[4, 4]])
+        expected = field.reveal(4, 4)
+        assert {(col, row) for col, row, _ in answer['changed']} == expected
+        for col, row, state in answer['changed']:
+            assert state == field.field[col][row].number
+        col, row = next((col, row) for col in range(9) for row in range(9) if not field.field[col][row].is_revealed)
+        answer = await client.flag(game['session'], [[col, row]])
+        assert answer['changed'] == [[col, row, Server.FLAGGED]]
+        assert (await client.request(op='stats'))['sessions'] == 1
+        await client.end(game['session'])
+        assert (await client.request(op='stats'))['sessions'] == 0
+
+    run(play)
+
+
+def test_errors_are_answered():
+    async def play(server, client, host, port):
+        with pytest.raises(RuntimeError):
+            await client.reveal('unknown', [[0, 0]])
+        game = await client.new(5, 5, 0, seed=1)
+        with pytest.raises(RuntimeError):
+            await client.reveal(game['session'], [[5, 0]])
+        # The connection is still usable after an error.
+        assert len((await client.reveal(game['session'], [[0, 0]]))['changed']) == 25
+
+    run(play)
+
+
+@pytest.mark.parametrize('squares', [[[0, 0], [1.5, 0]], [[True, 0]], [[0, '1']]])
+def test_squares_that_are_not_integers_apply_no_move(squares):
+    server = Server.GameServer()
+    session = server.handle({'op': 'new', 'columns': 5, 'rows': 5, 'mines': 0, 'seed': 1})['session']
+    with pytest.raises(TypeError):
+        server.handle({'op': 'reveal', 'session': session, 'squares': squares})
+    assert len(server.handle({'op': 'reveal', 'session': session, 'squares': [[0, 0]]})['changed']) == 25
+
+
+def test_too_long_line_is_answered_with_an_error():
+    async def play(server, client, host, port):
+        reader, writer = await asyncio.open_connection(host, port, limit=4 * Server.LINE_LIMIT)
+        writer.write(b'x' * (Server.LINE_LIMIT + 10) + b'\n')
+        await writer.drain()
+        assert 'error' in json.loads(await reader.readline())
+        assert await reader.read() == b''
+        writer.close()
+        # Other connections are not affected.
+        assert (await client.request(op='stats'))['sessions'] == 0
+
+    run(play)
+
+
+@pytest.mark.parametrize('request_', [
+    {'columns': 2, 'rows': 2, 'mines': 30},
+    {'columns': 2, 'rows': 2, 'mines': 4, 'first_click': 'safe'},
+    {'columns': 3, 'rows': 3, 'mines': 1, 'first_click': 'bogus'},
+    {'columns': 3, 'rows': 3.7, 'mines': 1},
+    {'columns': 3, 'rows': True, 'mines': 1},
+])
+def test_rejected_new_game_keeps_the_other_sessions(request_):
+    server = Server.GameServer(max_bytes=Server.memory_of_field(4, 4) + 20)
+    server.handle({'op': 'new', 'columns': 4, 'rows': 4, 'mines': 1})
+    with pytest.raises((ValueError, TypeError)):
+        server.handle({'op': 'new', **request_})
+    assert server.handle({'op': 'stats'})['sessions'] == 1
+
+
+def test_least_recently_used_sessions_are_evicted():
+    server = Server.GameServer(max_bytes=2 * Server.memory_of_field(4, 4))
+    first = server.handle({'op': 'new', 'columns': 4, 'rows': 4, 'mines': 1})['session']
+    second = server.handle({'op': 'new', 'columns': 4, 'rows': 4, 'mines': 1})['session']
+    server.handle({'op': 'reveal', 'session': first, 'squares': [[0, 0]]})
+    server.handle({'op': 'new', 'columns': 4, 'rows': 4, 'mines': 1})
+    server.handle({'op': 'reveal', 'session': first, 'squares': [[1, 1]]})
+    with pytest.raises(KeyError):
+        server.handle({'op': 'reveal', 'session': second, 'squares': [[0, 0]]})
+
+
+def test_memory_budget_counts_the_neighbor_index():
+    server = Server.GameServer(max_bytes=2 * Server.memory_of_field(10, 10))
+    sessions = [server.handle({'op': 'new', 'columns': 10, 'rows': 10, 'mines': 1})['session'] for _ in range(3)]
+    assert server.handle({'op': 'stats'}) == {'sessions': 2, 'bytes': 2 * Server.memory_of_field(10, 10)}
+    assert Server.memory_of_field(10, 10) > 100 * 32
+    with pytest.raises(KeyError):
+        server.handle({'op': 'close', 'session': sessions[0]})
+    with pytest.raises(ValueError):
+        server.handle({'op': 'new', 'columns': 20, 'rows': 11, 'mines': 1})
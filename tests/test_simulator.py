@@ -0,0 +1,39 @@
+"""Checks of the batch simulator."""
+import csv
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Simulator
+
+
+@pytest.mark.parametrize('policy', sorted(Simulator.POLICIES))
+def test_games_are_reproducible(policy):
+    results = [Simulator.play_game(9, 9, 10, policy, seed) for seed in range(20)]
+    assert results == [Simulator.play_game(9, 9, 10, policy, seed) for seed in range(20)]
+    for seed, won, moves, revealed in results:
+        assert won in (0, 1) and moves >= 1
+        assert revealed == 71 if won else revealed < 71
+
+
+def test_solver_wins_more_than_random():
+    wins = {policy: sum(Simulator.play_game(9, 9, 10, policy, seed)[1] for seed in range(50))
+            for policy in Simulator.POLICIES}
+    assert wins['solver'] > wins['random']
+
+
+def test_shards_keep_the_order_of_seeds():
+    results = list(Simulator.simulate(6, 6, 5, 25, policy='random', seed=100, workers=1, shard_size=7))
+    assert results == [Simulator.play_game(6, 6, 5, 'random', seed) for seed in range(100, 125)]
+
+
+def test_csv_output(tmp_path):
+    path = tmp_path / 'results.csv'
+    assert Simulator.main(['--games', '12', '--workers', '1', '--shard-size', '5', '--output', str(path)]) == 0
+    with open(path, newline='') as file:
+        rows = list(csv.reader(file))
+    assert rows[0] == Simulator.CSV_HEADER
+    assert [int(row[0]) for row in rows[1:]] == list(range(12))
@@ -0,0 +1,23 @@
+"""Checks of the scaling of the images of tiles (drawing them needs a display, so only 'TileCache.scale' is checked)."""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import TileCache
+
+
+@pytest.mark.parametrize('size, factors', [(25, (1, 4, 0)), (60, (3, 5, 0)), (100, (1, 1, 0)), (150, (3, 2, 0)),
+                                           (200, (2, 1, 0)), (1000, (10, 1, 0))])
+def test_exact_scales(size, factors):
+    assert TileCache.scale(100, size) == factors
+
+
+@pytest.mark.parametrize('asset_size', [37, 100])
+def test_every_size_is_covered(asset_size):
+    for size in range(1, 1200):
+        zoom, subsample, offset = TileCache.scale(asset_size, size)
+        assert (asset_size * zoom - 2 * offset) // subsample >= size
+        assert asset_size * zoom <= max(TileCache.MAX_ZOOMED, size + asset_size)